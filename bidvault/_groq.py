@@ -0,0 +1,131 @@
+"""
+_groq.py
+────────
+Shared Groq clients and system prompts.
+
+Every call site (IntakeAgent, scripts/ask_ai.py) gets the same client, so the
+httpx connection pool and its TLS sessions are reused instead of being rebuilt
+per agent or per question.
+
+Usage:
+    from bidvault._groq import get_client, get_async_client, SYSTEM_PROMPT_ASK
+    client = get_client()
+"""
+
+import asyncio
+import os
+import weakref
+from functools import lru_cache
+from typing import Optional
+
+
+# ── SYSTEM PROMPTS ────────────────────────────────────────────────────────────
+# Static and byte-identical across calls so the provider's prefix cache can reuse them.
+
+SYSTEM_PROMPT_INTAKE = (
+    "You are an expert Bid Strategy Analyst. You are analyzing PART of a large RFP document.\n\n"
+    "Extract a structured Bid Brief from this text. If information is NOT present in this specific part, "
+    "return null or empty lists. Do not hallucinate.\n\n"
+    "CRITICAL FIELDS TO FIND:\n"
+    "1. PROJECT NAME / CLIENT / REF #\n"
+    "2. DEADLINES (Submission vs Enquiries)\n"
+    "3. EVALUATION CRITERIA (Weights %)\n"
+    "4. SCOPE OF WORK & EXCLUSIONS\n"
+    "5. ELIGIBILITY & CERTIFICATIONS\n"
+    "6. MANDATORY DOCUMENTS\n\n"
+    "Return ONLY a JSON object using these exact lowercase keys:\n"
+    "project_name, client, reference_number, deadline, enquiries_deadline, summary,\n"
+    "project_duration, project_location, scope_of_work (list), out_of_scope (list),\n"
+    "evaluation_criteria (list of {criterion, weight}), technical_threshold,\n"
+    "experience_requirements (list), certifications_required (list),\n"
+    "mandatory_documents (list of {document_name, description}),\n"
+    "submission_method, contact_person, currency, preferencing."
+)
+
+SYSTEM_PROMPT_FINALIZE = (
+    "You are an expert Bid Strategy Analyst. You are given a Bid Brief that was merged from "
+    "several partial extractions of one RFP document, as JSON.\n\n"
+    "Clean it up: reconcile conflicting or duplicated values, remove near-duplicate list items, "
+    "and write a 2-3 sentence summary of the project from the fields provided. "
+    "Do not add information that is not already in the brief and do not drop distinct items.\n\n"
+    "Return ONLY a JSON object with exactly the same keys as the input."
+)
+
+SYSTEM_PROMPT_ASK = (
+    "You are an expert legal and proposal assistant for a Kenyan firm. "
+    "Your task is to answer the user's question using ONLY the provided context snippets. "
+    "If the answer is not in the context, say you don't know based on the current data. "
+    "Always cite the document name and year in your answer. "
+    "Keep your tone professional and helpful."
+)
+
+
+# ── CLIENTS ───────────────────────────────────────────────────────────────────
+
+# Connection pool shared by every request through a client
+MAX_CONNECTIONS           = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+def _http2_available() -> bool:
+    """HTTP/2 multiplexing needs the optional h2 package (pip install "httpx[http2]")."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _httpx_options() -> dict:
+    import httpx
+    return {
+        "http2":  _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    }
+
+
+def resolve_api_key(api_key: Optional[str] = None) -> str:
+    api_key = api_key or os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY not found in environment")
+    return api_key
+
+
+@lru_cache(maxsize=4)
+def _sync_client(api_key: str):
+    try:
+        from groq import Groq, DefaultHttpxClient
+    except ImportError:
+        raise ImportError("Run: pip install groq")
+    return Groq(api_key=api_key, http_client=DefaultHttpxClient(**_httpx_options()))
+
+
+def get_client(api_key: Optional[str] = None):
+    """Process-wide Groq client for the given key (defaults to GROQ_API_KEY)."""
+    return _sync_client(resolve_api_key(api_key))
+
+
+# httpx.AsyncClient is bound to the event loop it first runs on, and the sync
+# wrappers use asyncio.run() (a fresh loop per call), so async clients are
+# shared per loop rather than per process.
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_async_client(api_key: Optional[str] = None):
+    """AsyncGroq client shared by every caller on the current event loop."""
+    try:
+        from groq import AsyncGroq, DefaultAsyncHttpxClient
+    except ImportError:
+        raise ImportError("Run: pip install groq")
+
+    api_key = resolve_api_key(api_key)
+    loop    = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    if api_key not in clients:
+        clients[api_key] = AsyncGroq(
+            api_key=api_key, http_client=DefaultAsyncHttpxClient(**_httpx_options())
+        )
+    return clients[api_key]
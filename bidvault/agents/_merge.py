@@ -0,0 +1,118 @@
+"""
+_merge.py
+─────────
+Merge logic for the Intake Agent: folds one batch's brief into the master brief.
+
+Kept in its own fully annotated module with no pydantic / Groq imports so it
+can be compiled ahead of time with mypyc:
+
+    pip install mypy
+    mypyc bidvault/agents/_merge.py
+
+The compiled extension (_merge.*.so) is picked up automatically when it sits
+next to this file; delete it (or run under PyPy) to use the pure-Python module.
+"""
+
+import re
+from typing import Any, Callable, FrozenSet, List, Sequence, Set
+
+
+SCALAR_FIELDS = (
+    "project_name", "client", "reference_number", "country", "deadline",
+    "enquiries_deadline", "summary", "project_duration", "project_location",
+    "technical_threshold", "submission_method", "contact_person", "currency",
+    "preferencing",
+)
+LIST_FIELDS = ("scope_of_work", "out_of_scope", "experience_requirements", "certifications_required")
+
+# Values the LLM returns when it found nothing; these never overwrite a real value
+PLACEHOLDER_VALUES = ("Unknown Project", "Unknown Client", "No summary available", "Kenya", None)
+
+# Items whose word sets overlap at least this much (Dice coefficient) are duplicates
+FUZZY_DEDUP_THRESHOLD = 0.88
+
+_WORD = re.compile(r"\w+")
+
+
+def _identity(item: Any) -> Any:
+    return item
+
+
+def merge_scalar(current: Any, incoming: Any) -> Any:
+    """Keep current unless incoming is a real value; flatten dict/list LLM structures to text."""
+    # If the incoming is a dict or list (LLM structure), serialize it to a clean string
+    if isinstance(incoming, dict):
+        if len(incoming) == 1:
+            # If it's a simple dict with one key, just take the value
+            incoming = next(iter(incoming.values()))
+        else:
+            # If it's a dict like {'submission': '18 Feb', 'enquiries': None}, join them
+            incoming = " | ".join(f"{k}: {v}" for k, v in incoming.items() if v)
+    elif isinstance(incoming, list):
+        incoming = str(incoming)
+
+    if incoming and incoming not in PLACEHOLDER_VALUES:
+        return incoming
+    return current
+
+
+def word_set(value: Any) -> FrozenSet[str]:
+    return frozenset(_WORD.findall(str(value).lower()))
+
+
+def merge_unique(a: Sequence[Any], b: Sequence[Any], key: Callable[[Any], Any] = _identity) -> List[Any]:
+    """
+    Order-preserving union of two lists. An item is dropped when its key has the
+    same words as, or a word-set Dice similarity >= FUZZY_DEDUP_THRESHOLD with,
+    an item already kept. Case, punctuation and whitespace are ignored.
+    """
+    kept:  List[Any] = []
+    exact: Set[FrozenSet[str]] = set()
+    seen:  List[FrozenSet[str]] = []   # word sets of kept items
+    for item in (*a, *b):
+        if not item:
+            continue
+        words = word_set(key(item))
+        if not words:
+            words = frozenset([str(key(item)).strip()])
+        if words in exact:
+            continue
+        duplicate = False
+        for other in seen:
+            if 2 * len(words & other) >= FUZZY_DEDUP_THRESHOLD * (len(words) + len(other)):
+                duplicate = True
+                break
+        if duplicate:
+            continue
+        exact.add(words)
+        seen.append(words)
+        kept.append(item)
+    return kept
+
+
+def _criterion_name(item: Any) -> Any:
+    return item.criterion
+
+
+def _document_name(item: Any) -> Any:
+    return item.document_name
+
+
+def merge_into(master: Any, new: Any) -> None:
+    """Merge brief `new` into `master` in place (both shaped like RFPBrief)."""
+    # Update Single Fields (Keep existing if new is null/default)
+    for name in SCALAR_FIELDS:
+        setattr(master, name, merge_scalar(getattr(master, name), getattr(new, name)))
+
+    # Merge Lists (Append and Deduplicate near-identical wording, first spelling wins).
+    # Overlapping batches often return the same bullet with slightly different words.
+    for name in LIST_FIELDS:
+        setattr(master, name, merge_unique(getattr(master, name), getattr(new, name)))
+
+    # Merge List of Objects (Deduplicate by name, same fuzzy rule)
+    master.evaluation_criteria = merge_unique(
+        master.evaluation_criteria, new.evaluation_criteria, key=_criterion_name
+    )
+    master.mandatory_documents = merge_unique(
+        master.mandatory_documents, new.mandatory_documents, key=_document_name
+    )
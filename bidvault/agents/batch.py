@@ -0,0 +1,235 @@
+"""
+batch.py
+────────
+Groq Batch API support for the Intake Agent.
+
+Instead of one live chat completion per RFP batch, requests are queued,
+flushed together as a single JSONL file to Groq's Batch API (50% cheaper,
+no per-request round-trips), and resolved when the batch job completes.
+
+Usage:
+    from bidvault.agents.intake import IntakeAgent
+    briefs = IntakeAgent().extract_briefs_batch([text_a, text_b])
+
+    # From async code (e.g. FastAPI) — one queue per event loop:
+    from bidvault.agents.batch import get_batch_queue
+    future = await get_batch_queue().submit(body)
+
+ENVIRONMENT VARIABLES:
+  BIDVAULT_BATCH — set to "groq" to make /api/intake/analyze queue a job and
+                   return 202 instead of waiting for the brief.
+  BIDVAULT_JOB_TTL — seconds a finished job stays pollable (default 3600)
+
+Jobs live in the memory of the process that created them, so batch mode
+needs a single server worker (uvicorn --workers 1): with more, a poll that
+lands on another worker gets 404.
+"""
+
+import asyncio
+import io
+import os
+import time
+import uuid
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+from bidvault._groq import get_async_client
+
+
+FLUSH_INTERVAL_S  = 5.0     # collect requests for this long before submitting a batch
+POLL_INTERVAL_S   = 30.0    # how often to check a submitted batch
+COMPLETION_WINDOW = "24h"
+ENDPOINT          = "/v1/chat/completions"
+JOB_TTL_S         = float(os.getenv("BIDVAULT_JOB_TTL", "3600"))
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def is_groq_available() -> bool:
+    """True when the groq SDK is installed and an API key is configured."""
+    try:
+        import groq  # noqa: F401
+    except ImportError:
+        return False
+    return bool(os.getenv("GROQ_API_KEY"))
+
+
+def batch_mode_enabled() -> bool:
+    return os.getenv("BIDVAULT_BATCH", "").lower() == "groq" and is_groq_available()
+
+
+# ── QUEUE ─────────────────────────────────────────────────────────────────────
+
+class BatchQueue:
+    """
+    Collects chat-completion request bodies and submits them to the Batch API
+    every flush_interval seconds. submit() returns a Future that resolves to
+    the message content (str) of that request's completion.
+    """
+
+    def __init__(
+        self,
+        api_key:        Optional[str] = None,
+        flush_interval: float = FLUSH_INTERVAL_S,
+        poll_interval:  float = POLL_INTERVAL_S,
+    ):
+        self.api_key        = api_key
+        self.flush_interval = flush_interval
+        self.poll_interval  = poll_interval
+        self._pending: List[Tuple[str, dict, asyncio.Future]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._tasks:   set = set()   # keep poll tasks referenced until they finish
+
+    async def submit(self, body: dict) -> asyncio.Future:
+        """Queue one /v1/chat/completions request body."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((uuid.uuid4().hex, body, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+        return future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Submit everything queued so far as one batch job."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        futures = {custom_id: future for custom_id, _, future in pending}
+        try:
+            client = get_async_client(self.api_key)
+            buf    = io.BytesIO()
+            for custom_id, body, _ in pending:
+                buf.write(orjson.dumps({
+                    "custom_id": custom_id,
+                    "method":    "POST",
+                    "url":       ENDPOINT,
+                    "body":      body,
+                }))
+                buf.write(b"\n")
+
+            upload = await client.files.create(
+                file=("bidvault_batch.jsonl", buf.getvalue(), "application/jsonl"),
+                purpose="batch",
+            )
+            batch = await client.batches.create(
+                input_file_id=upload.id,
+                endpoint=ENDPOINT,
+                completion_window=COMPLETION_WINDOW,
+            )
+            print(f"DEBUG: Submitted Groq batch {batch.id} with {len(pending)} requests")
+        except Exception as e:
+            _fail_all(futures, e)
+            return
+
+        task = asyncio.create_task(self._poll(batch.id, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _poll(self, batch_id: str, futures: Dict[str, asyncio.Future]):
+        client = get_async_client(self.api_key)
+        try:
+            while True:
+                batch = await client.batches.retrieve(batch_id)
+                if batch.status in _TERMINAL_STATUSES:
+                    break
+                await asyncio.sleep(self.poll_interval)
+
+            if batch.output_file_id:
+                content = await client.files.content(batch.output_file_id)
+                _resolve_lines(await _read_bytes(content), futures)
+            if batch.error_file_id:
+                content = await client.files.content(batch.error_file_id)
+                _resolve_lines(await _read_bytes(content), futures)
+            _fail_all(futures, RuntimeError(f"Groq batch {batch_id} ended with status '{batch.status}'"))
+        except Exception as e:
+            _fail_all(futures, e)
+
+
+async def _read_bytes(response) -> bytes:
+    """files.content() returns a binary response whose read() is sync or async depending on SDK version."""
+    data = response.read()
+    if asyncio.iscoroutine(data):
+        data = await data
+    return data
+
+
+def _resolve_lines(data: bytes, futures: Dict[str, asyncio.Future]):
+    """Resolve futures from a batch output / error JSONL file."""
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        record = orjson.loads(line)
+        future = futures.get(record.get("custom_id"))
+        if future is None or future.done():
+            continue
+        response = record.get("response") or {}
+        body     = response.get("body") or {}
+        if record.get("error") or response.get("status_code", 200) >= 400 or not body.get("choices"):
+            future.set_exception(RuntimeError(f"Batch request failed: {record.get('error') or body}"))
+        else:
+            future.set_result(body["choices"][0]["message"]["content"])
+
+
+def _fail_all(futures: Dict[str, asyncio.Future], error: Exception):
+    for future in futures.values():
+        if not future.done():
+            future.set_exception(error)
+
+
+_queues: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_batch_queue() -> BatchQueue:
+    """The BatchQueue for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _queues:
+        _queues[loop] = BatchQueue()
+    return _queues[loop]
+
+
+# ── JOBS ──────────────────────────────────────────────────────────────────────
+# In-memory job table for the 202 flow in api/intake.py. Jobs are lost on
+# restart and not shared between worker processes (see the module docstring).
+# Finished jobs are dropped JOB_TTL_S after they finish.
+
+_JOBS: Dict[str, dict] = {}
+
+
+def create_job() -> str:
+    _expire_jobs()
+    job_id = uuid.uuid4().hex
+    _JOBS[job_id] = {"status": "queued", "brief": None, "error": None, "finished_at": None}
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    _expire_jobs()
+    return _JOBS.get(job_id)
+
+
+def _expire_jobs():
+    cutoff  = time.monotonic() - JOB_TTL_S
+    expired = [job_id for job_id, job in _JOBS.items()
+               if job["finished_at"] is not None and job["finished_at"] < cutoff]
+    for job_id in expired:
+        del _JOBS[job_id]
+
+
+async def run_brief_job(job_id: str, text: str):
+    """Background task: extract one brief through the Batch API and record the outcome."""
+    from bidvault.agents.intake import IntakeAgent
+
+    job = _JOBS[job_id]
+    job["status"] = "running"
+    try:
+        briefs = await IntakeAgent().extract_briefs_batch_async([text])
+        job["brief"], job["status"] = briefs[0], "completed"
+    except Exception as e:
+        job["error"], job["status"] = str(e), "failed"
+    job["finished_at"] = time.monotonic()
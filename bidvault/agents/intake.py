@@ -15,9 +15,62 @@ Usage:
     print(brief.evaluation_criteria)
 """
 
-from typing import List, Optional, Any
+import asyncio
+import hashlib
+import inspect
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Iterator, List, Optional, Any
+
+import msgspec
+import orjson
 from pydantic import BaseModel, Field
 
+from bidvault.agents._merge import merge_into
+from bidvault.agents.batch import get_batch_queue
+from bidvault._groq import (
+    SYSTEM_PROMPT_FINALIZE, SYSTEM_PROMPT_INTAKE,
+    get_async_client, get_client, resolve_api_key,
+)
+
+
+# Groq's free tier allows ~30 requests and ~30k tokens per minute. Batches are
+# fired concurrently, but request starts are held back to stay inside both budgets.
+# On a paid tier set GROQ_RPM / GROQ_TPM (GROQ_TPM applies to every model); the
+# token budget also follows the x-ratelimit-limit-tokens Groq reports.
+MAX_CONCURRENT_BATCHES = 4
+REQUESTS_PER_MINUTE    = int(os.environ.get("GROQ_RPM", 30))
+TOKENS_PER_MINUTE      = int(os.environ.get("GROQ_TPM", 30000))
+
+# Per-batch scraping runs on a small, fast model; the large model only sees the
+# merged brief once, to reconcile conflicts and write the summary.
+CHUNK_MODEL = "llama-3.1-8b-instant"
+FINAL_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+# Finished briefs and per-batch results are cached by content hash, so
+# re-running on the same (or a partly edited) RFP skips the LLM calls.
+INTAKE_CACHE_PATH = os.environ.get(
+    "INTAKE_CACHE_PATH", os.path.join(".bidvault_cache", "intake.sqlite3")
+)
+# Most recently used entries are also kept in memory, in front of the SQLite file
+MEMORY_CACHE_ENTRIES = 256
+
+# Free-tier token budgets that differ from TOKENS_PER_MINUTE (unless GROQ_TPM is set)
+MODEL_TOKENS_PER_MINUTE = {
+    "llama-3.1-8b-instant": 6000,
+}
+
+# Batch sizing in tokens (~15k chars of English per batch, as before)
+CHUNK_TOKENS               = 3750
+OVERLAP_TOKENS             = 250
+COMPLETION_TOKENS_ESTIMATE = 1000
+
 
 # ── SUB-MODELS ────────────────────────────────────────────────────────────────
 
@@ -72,6 +125,83 @@ class RFPBrief(BaseModel):
     preferencing:   Optional[Any] = Field(default=None, description="Local content policies")
 
 
+# ── INTERNAL SHAPES ───────────────────────────────────────────────────────────
+# msgspec mirrors of the models above. Raw LLM JSON is decoded straight into
+# these (several times faster than pydantic) and batch results are merged on
+# them in place; only the final merged brief becomes a pydantic RFPBrief.
+# gc=False: these hold plain JSON values and never form reference cycles.
+
+class _CriterionStruct(msgspec.Struct, gc=False):
+    criterion: str
+    weight:    Any = None
+
+class _DocumentStruct(msgspec.Struct, gc=False):
+    document_name: str
+    description:   Any = None
+
+class _BriefStruct(msgspec.Struct, kw_only=True, gc=False):
+    project_name:            Any = "Unknown Project"
+    client:                  Any = "Unknown Client"
+    reference_number:        Any = None
+    country:                 Any = "Kenya"
+    deadline:                Any = None
+    enquiries_deadline:      Any = None
+    summary:                 Any = "No summary available"
+    project_duration:        Any = None
+    project_location:        Any = None
+    scope_of_work:           List[Any] = []
+    out_of_scope:            List[Any] = []
+    evaluation_criteria:     List[_CriterionStruct] = []
+    technical_threshold:     Any = None
+    experience_requirements: List[Any] = []
+    certifications_required: List[Any] = []
+    mandatory_documents:     List[_DocumentStruct] = []
+    submission_method:       Any = None
+    contact_person:          Any = None
+    currency:                Any = None
+    preferencing:            Any = None
+
+    def model_dump(self) -> dict:
+        """Same shape as RFPBrief.model_dump(), for code that expects the pydantic API."""
+        return msgspec.to_builtins(self)
+
+
+_BRIEF_DECODER = msgspec.json.Decoder(_BriefStruct)
+
+
+# Models that accept response_format=json_schema on Groq. Others get plain JSON mode.
+STRUCTURED_OUTPUT_MODELS = frozenset({
+    "meta-llama/llama-4-scout-17b-16e-instruct",
+    "meta-llama/llama-4-maverick-17b-128e-instruct",
+    "moonshotai/kimi-k2-instruct",
+    "openai/gpt-oss-20b",
+    "openai/gpt-oss-120b",
+})
+
+
+@lru_cache(maxsize=None)
+def _brief_json_schema() -> dict:
+    return RFPBrief.model_json_schema()
+
+
+def _response_format(model: str) -> dict:
+    """
+    Server-side schema for models that support structured outputs, so the reply
+    already has RFPBrief's shape. Not strict: the free-text fields are typed Any.
+    """
+    if model not in STRUCTURED_OUTPUT_MODELS:
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "RFPBrief", "schema": _brief_json_schema(), "strict": False},
+    }
+
+
+def _decode_brief(raw_json: str) -> _BriefStruct:
+    """Decode and validate LLM JSON with msgspec."""
+    return _BRIEF_DECODER.decode(raw_json)
+
+
 # ── AGENT ─────────────────────────────────────────────────────────────────────
 
 class IntakeAgent:
@@ -85,157 +215,257 @@ class IntakeAgent:
     - Uses explicit JSON key names in the prompt to prevent schema mismatch.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
-        import os
-        from groq import Groq
-
-        self.api_key = api_key or os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY not found in environment")
-
-        self.client = Groq(api_key=self.api_key)
-        self.model  = "meta-llama/llama-4-scout-17b-16e-instruct"
+    def __init__(
+        self,
+        api_key:     Optional[str] = None,
+        model:       str = FINAL_MODEL,
+        chunk_model: str = CHUNK_MODEL,
+        cache_path:  Optional[str] = INTAKE_CACHE_PATH,
+    ):
+        # Clients are shared process-wide (see bidvault/_groq.py), so building
+        # an agent per request does not open new connections.
+        self.api_key     = resolve_api_key(api_key)
+        self.client      = get_client(self.api_key)
+        self.model       = model
+        self.chunk_model = chunk_model
+        self.cache       = _BriefCache(cache_path)   # memory-only when cache_path is None
+
+    @property
+    def async_client(self):
+        """AsyncGroq client for the running event loop."""
+        return get_async_client(self.api_key)
+
+    def extract_brief(self, text: str, digest: bool = True, use_cache: bool = True) -> RFPBrief:
+        """
+        Sync wrapper around extract_brief_async for scripts and CLI use.
+        Inside a running event loop (e.g. FastAPI), await extract_brief_async instead.
+        """
+        return asyncio.run(self.extract_brief_async(text, digest=digest, use_cache=use_cache))
 
-    def extract_brief(self, text: str) -> RFPBrief:
+    async def extract_brief_async(self, text: str, digest: bool = True, use_cache: bool = True) -> RFPBrief:
         """
-        Analyzes RFP text in batches to handle large documents (>40k chars).
-        Splits text, extracts info from each part, and merges the results.
+        Analyzes RFP text in token-sized batches to handle large documents.
+        Splits text, extracts info from every part concurrently, and merges the results.
+        With digest=True only the cover page and the text around known section
+        headers is sent (see _section_digest); pass digest=False to send everything.
+        Results are cached by content hash; use_cache=False forces re-extraction.
         """
         # Step 0: Cleanup
-        text = "".join(char for char in text if char.isprintable() or char in "\n\r\t")
-        
-        # Define chunking parameters
-        # 15,000 chars is ~3.7k tokens. llama-3.1-8b-instant has a 6,000 TPM limit on Groq free tier.
-        CHUNK_SIZE = 15000 
-        OVERLAP = 1000 
-        
-        chunks = []
-        for i in range(0, len(text), CHUNK_SIZE - OVERLAP):
-            chunks.append(text[i : i + CHUNK_SIZE])
-            if i + CHUNK_SIZE >= len(text):
-                break
-
-        print(f"DEBUG: Processing document in {len(chunks)} batches...")
-        import time
-
-        master_brief = RFPBrief()
-
-        for idx, chunk_text in enumerate(chunks):
-            print(f"       -> Analyzing batch {idx+1}/{len(chunks)}...")
-            chunk_brief = self._extract_chunk(chunk_text, batch_index=idx+1, total_batches=len(chunks))
-            master_brief = self._merge_briefs(master_brief, chunk_brief)
-            
-            # Wait 10 seconds between batches to avoid TPM rate limit on Groq
-            if idx < len(chunks) - 1:
-                time.sleep(10)
-
-        return master_brief
+        text = _clean_for_llm(text)
+        if digest:
+            text = _section_digest(text)
+
+        cache   = self.cache if use_cache else None
+        doc_key = _cache_key("brief", self.chunk_model, self.model, SYSTEM_PROMPT_FINALIZE, text)
+        cached  = cache.get(doc_key) if cache else None
+        if cached is not None:
+            print("DEBUG: Brief served from cache")
+            return _build_brief(cached)
+
+        # Token-sized windows that end on a paragraph break where possible. Only the
+        # (start, end) bounds are kept; each batch's text is sliced when it is sent.
+        bounds = list(_token_bounds(text, CHUNK_TOKENS, OVERLAP_TOKENS))
+        total  = len(bounds)
+
+        print(f"DEBUG: Processing document in {total} batches...")
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+        limiter   = _RateLimiter(
+            REQUESTS_PER_MINUTE, _tokens_per_minute(self.chunk_model)
+        )
+        usage     = {"prompt_tokens": 0, "cached_tokens": 0}
+        overhead  = count_tokens(SYSTEM_PROMPT_INTAKE) + COMPLETION_TOKENS_ESTIMATE
+
+        async def run_batch(idx: int, start: int, end: int, chunk_tokens: int) -> _BriefStruct:
+            async with semaphore:
+                chunk_text = text[start:end]
+                # The prompt names the batch position ("batch i of N"), so it is part of the key
+                chunk_key  = _cache_key("chunk", self.chunk_model, f"{idx}/{total}", chunk_text)
+                cached     = cache.get(chunk_key) if cache else None
+                if cached is not None:
+                    print(f"       -> Batch {idx}/{total} served from cache")
+                    return cached
+                await limiter.acquire(chunk_tokens + overhead)
+                print(f"       -> Analyzing batch {idx}/{total}...")
+                result = await self._extract_chunk(
+                    chunk_text, batch_index=idx, total_batches=total,
+                    usage=usage, limiter=limiter,
+                )
+            if cache and result != _BriefStruct():   # don't pin failed / empty batches
+                cache.put(chunk_key, result)
+            return result
+
+        tasks = deque(
+            asyncio.ensure_future(run_batch(idx, *bound))
+            for idx, bound in enumerate(bounds, 1)
+        )
 
-    def _extract_chunk(self, text: str, batch_index: int, total_batches: int) -> RFPBrief:
-        """Helper to run LLM extraction on a single chunk of text."""
-        system_prompt = (
-            "You are an expert Bid Strategy Analyst. You are analyzing PART of a large RFP document.\n"
+        # Fold results in document order as they arrive, so later batches override
+        # earlier ones as before and each result is released once merged.
+        master_brief = _BriefStruct()
+        complete     = True      # every batch came back with something
+        for idx in range(1, total + 1):
+            task = tasks.popleft()   # only this loop holds the task (and its result) from here
+            try:
+                chunk_brief = await task
+            except Exception as e:
+                print(f"Error in batch {idx}: {e}")
+                complete = False
+                continue
+            if chunk_brief == _BriefStruct():   # _extract_chunk's result for a failed call
+                complete = False
+            self._merge_briefs(master_brief, chunk_brief)
+
+        # One large-model pass over the merged result (nothing to reconcile for a single batch)
+        if total > 1:
+            master_brief = await self._finalize_brief(master_brief)
+
+        if usage["prompt_tokens"]:
+            hit_rate = usage["cached_tokens"] / usage["prompt_tokens"]
+            print(f"DEBUG: Prompt cache hit rate {hit_rate:.0%} "
+                  f"({usage['cached_tokens']:,}/{usage['prompt_tokens']:,} prompt tokens)")
+
+        # A brief missing failed batches is returned, but not pinned in the cache
+        if cache and complete:
+            cache.put(doc_key, master_brief)
+        return _build_brief(master_brief)
+
+    def extract_briefs_batch(self, texts: List[str], digest: bool = True) -> List[RFPBrief]:
+        """Sync wrapper around extract_briefs_batch_async."""
+        return asyncio.run(self.extract_briefs_batch_async(texts, digest=digest))
+
+    async def extract_briefs_batch_async(self, texts: List[str], digest: bool = True) -> List[RFPBrief]:
+        """
+        Extract briefs for several RFPs through Groq's Batch API (see batch.py).
+        Every window of every document goes into one queued batch job instead of
+        a live call each; results can take minutes (up to the 24h window).
+        Briefs are merged per document but skip the large-model finalize pass.
+        Raises RuntimeError if every request for a document failed.
+        """
+        queue = get_batch_queue()
+        docs  = []
+        for text in texts:
+            text   = _clean_for_llm(text)
+            if digest:
+                text = _section_digest(text)
+            bounds = list(_token_bounds(text, CHUNK_TOKENS, OVERLAP_TOKENS))
+            docs.append([
+                await queue.submit(self._chunk_request(text[start:end], idx, len(bounds)))
+                for idx, (start, end, _) in enumerate(bounds, 1)
+            ])
+        print(f"DEBUG: Queued {sum(map(len, docs))} batches for {len(texts)} documents")
+
+        briefs = []
+        for n, futures in enumerate(docs, 1):
+            master_brief = _BriefStruct()
+            merged, error = 0, None
+            for idx, future in enumerate(futures, 1):
+                try:
+                    self._merge_briefs(master_brief, _decode_brief(await future))
+                    merged += 1
+                except Exception as e:
+                    print(f"Error in batch {idx}: {e}")
+                    error = e
+            # An empty brief would read as a successful extraction
+            if futures and not merged:
+                raise RuntimeError(f"All {len(futures)} batch requests failed for document {n}: {error}")
+            briefs.append(_build_brief(master_brief))
+        return briefs
+
+    def _chunk_request(self, text: str, batch_index: int, total_batches: int) -> dict:
+        """Chat-completion request body for one batch (shared by the live and Batch API paths)."""
+        # The system prompt is byte-identical for every batch so the provider can
+        # serve it from its prefix cache; per-batch context goes in the user turn.
+        user_prompt = (
             f"CONTEXT: This is batch {batch_index} of {total_batches}.\n\n"
-            "Extract a structured Bid Brief from this text. If information is NOT present in this specific part, "
-            "return null or empty lists. Do not hallucinate.\n\n"
-            "CRITICAL FIELDS TO FIND:\n"
-            "1. PROJECT NAME / CLIENT / REF #\n"
-            "2. DEADLINES (Submission vs Enquiries)\n"
-            "3. EVALUATION CRITERIA (Weights %)\n"
-            "4. SCOPE OF WORK & EXCLUSIONS\n"
-            "5. ELIGIBILITY & CERTIFICATIONS\n"
-            "6. MANDATORY DOCUMENTS\n\n"
-            "Return ONLY a JSON object using these exact lowercase keys:\n"
-            "project_name, client, reference_number, deadline, enquiries_deadline, summary,\n"
-            "project_duration, project_location, scope_of_work (list), out_of_scope (list),\n"
-            "evaluation_criteria (list of {criterion, weight}), technical_threshold,\n"
-            "experience_requirements (list), certifications_required (list),\n"
-            "mandatory_documents (list of {document_name, description}),\n"
-            "submission_method, contact_person, currency, preferencing."
+            f"Analyze this text part:\n\n{text}"
         )
+        return {
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT_INTAKE},
+                {"role": "user",   "content": user_prompt},
+            ],
+            "model":           self.chunk_model,
+            "response_format": _response_format(self.chunk_model),
+            "temperature":     0.1,
+        }
+
+    async def _extract_chunk(
+        self,
+        text:          str,
+        batch_index:   int,
+        total_batches: int,
+        usage:         Optional[dict] = None,
+        limiter:       Optional["_RateLimiter"] = None,
+    ) -> _BriefStruct:
+        """Helper to run LLM extraction on a single chunk of text."""
+        try:
+            # Raw response so the rate-limit headers can feed the limiter
+            raw = await self.async_client.chat.completions.with_raw_response.create(
+                **self._chunk_request(text, batch_index, total_batches)
+            )
+            if limiter is not None:
+                limiter.observe(raw.headers)
+            chat_completion = raw.parse()
+            if inspect.isawaitable(chat_completion):
+                chat_completion = await chat_completion
+            if usage is not None:
+                _record_usage(usage, chat_completion)
+            raw_json = chat_completion.choices[0].message.content
+            return _decode_brief(raw_json)
+        except Exception as e:
+            print(f"Error in batch {batch_index}: {e}")
+            return _BriefStruct() # Return empty brief on failure for this chunk
 
+    async def _finalize_brief(self, master: _BriefStruct) -> _BriefStruct:
+        """
+        Send the merged brief to the large model to reconcile conflicts and write
+        the summary. Returns the merged brief unchanged if the call fails.
+        """
+        print(f"       -> Finalizing brief with {self.model}...")
         try:
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = await self.async_client.chat.completions.create(
                 messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user",   "content": f"Analyze this text part:\n\n{text}"}
+                    {"role": "system", "content": SYSTEM_PROMPT_FINALIZE},
+                    {"role": "user",   "content": msgspec.json.encode(master).decode()}
                 ],
                 model=self.model,
-                response_format={"type": "json_object"},
+                response_format=_response_format(self.model),
                 temperature=0.1,
             )
-            raw_json = chat_completion.choices[0].message.content
-            return RFPBrief.model_validate_json(raw_json)
+            final = _decode_brief(chat_completion.choices[0].message.content)
         except Exception as e:
-            print(f"Error in batch {batch_index}: {e}")
-            return RFPBrief() # Return empty brief on failure for this chunk
-
-    def _merge_briefs(self, master: RFPBrief, new: RFPBrief) -> RFPBrief:
-        """Merges a new chunk's data into the master brief."""
-        
-        def update_field(current, incoming, default_vals=["Unknown Project", "Unknown Client", "No summary available", "Kenya", None]):
-            # If the incoming is a dict or list (LLM structure), serialize it to a clean string
-            if isinstance(incoming, (dict, list)):
-                import json
-                try:
-                    # If it's a simple dict with one key, just take the value
-                    if isinstance(incoming, dict) and len(incoming) == 1:
-                        incoming = list(incoming.values())[0]
-                    # If it's a dict like {'submission': '18 Feb', 'enquiries': None}, join them
-                    elif isinstance(incoming, dict):
-                        parts = [f"{k}: {v}" for k, v in incoming.items() if v]
-                        incoming = " | ".join(parts)
-                    else:
-                        incoming = str(incoming)
-                except:
-                    incoming = str(incoming)
-
-            if incoming and incoming not in default_vals:
-                return incoming
-            return current
-
-        # Update Single Fields (Keep existing if new is null/default)
-        master.project_name    = update_field(master.project_name, new.project_name)
-        master.client          = update_field(master.client, new.client)
-        master.reference_number = update_field(master.reference_number, new.reference_number)
-        master.country         = update_field(master.country, new.country)
-        master.deadline        = update_field(master.deadline, new.deadline)
-        master.enquiries_deadline = update_field(master.enquiries_deadline, new.enquiries_deadline)
-        master.summary         = update_field(master.summary, new.summary)
-        master.project_duration = update_field(master.project_duration, new.project_duration)
-        master.project_location = update_field(master.project_location, new.project_location)
-        master.technical_threshold = update_field(master.technical_threshold, new.technical_threshold)
-        master.submission_method = update_field(master.submission_method, new.submission_method)
-        master.contact_person  = update_field(master.contact_person, new.contact_person)
-        master.currency        = update_field(master.currency, new.currency)
-        master.preferencing    = update_field(master.preferencing, new.preferencing)
-
-        # Merge Lists (Append and Deduplicate)
-        master.scope_of_work = list(set(master.scope_of_work + new.scope_of_work))
-        master.out_of_scope  = list(set(master.out_of_scope + new.out_of_scope))
-        master.experience_requirements = list(set(master.experience_requirements + new.experience_requirements))
-        master.certifications_required = list(set(master.certifications_required + new.certifications_required))
-
-        # Merge List of Objects (Deduplicate by name)
-        existing_crits = {c.criterion.lower(): c for c in master.evaluation_criteria}
-        for c in new.evaluation_criteria:
-            if c.criterion.lower() not in existing_crits:
-                master.evaluation_criteria.append(c)
-
-        existing_docs = {d.document_name.lower(): d for d in master.mandatory_documents}
-        for d in new.mandatory_documents:
-            if d.document_name.lower() not in existing_docs:
-                master.mandatory_documents.append(d)
+            print(f"Error finalizing brief, keeping merged result: {e}")
+            return master
+
+        # The cleaned-up values win, but a field the model blanked keeps its merged value
+        defaults = _BriefStruct()
+        for name in _BriefStruct.__struct_fields__:
+            value = getattr(final, name)
+            if value and value != getattr(defaults, name):
+                setattr(master, name, value)
+        return master
 
+    def _merge_briefs(self, master: _BriefStruct, new: _BriefStruct) -> _BriefStruct:
+        """
+        Merges a new chunk's data into the master brief, in place (see _merge.py).
+        Both are msgspec structs so merging N batches never goes through pydantic;
+        _build_brief turns the master into an RFPBrief once at the end.
+        """
+        merge_into(master, new)
         return master
 
     def custom_extract(self, text: str, fields: List[str], custom_prompt: Optional[str] = None) -> dict:
+        """Sync wrapper around custom_extract_async for scripts and CLI use."""
+        return asyncio.run(self.custom_extract_async(text, fields, custom_prompt))
+
+    async def custom_extract_async(self, text: str, fields: List[str], custom_prompt: Optional[str] = None) -> dict:
         """
         Extracts custom fields from any document text.
         This is the generalized version of extract_brief.
         """
         # Cleanup
-        text = "".join(char for char in text if char.isprintable() or char in "\n\r\t")
+        text = _clean_for_llm(text)
         
         # Take first 30k chars for custom extraction (simpler than full batching for now)
         sample_text = text[:30000]
@@ -250,7 +480,8 @@ class IntakeAgent:
         system_prompt += "Return ONLY a JSON object. If a field is not found, return null."
 
         try:
-            chat_completion = self.client.chat.completions.create(
+            # Awaited on the shared async client so the event loop keeps serving other requests
+            chat_completion = await self.async_client.chat.completions.create(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user",   "content": f"Analyze this text:\n\n{sample_text}"}
@@ -259,8 +490,325 @@ class IntakeAgent:
                 response_format={"type": "json_object"},
                 temperature=0.1,
             )
-            import json
-            return json.loads(chat_completion.choices[0].message.content)
+            return orjson.loads(chat_completion.choices[0].message.content)
         except Exception as e:
             print(f"Error in custom extraction: {e}")
             return {"error": str(e)}
+
+
+# ── RESULT CACHE ──────────────────────────────────────────────────────────────
+
+def _cache_key(*parts: str) -> str:
+    """sha256 over the parts; the extraction prompt is always included so edits to it invalidate."""
+    h = hashlib.sha256(SYSTEM_PROMPT_INTAKE.encode())
+    for part in parts:
+        h.update(b"\x00")
+        h.update(part.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class _BriefCache:
+    """
+    SQLite key → brief store. Holds both whole-document briefs and per-batch
+    results, encoded as msgspec JSON. The last max_memory entries used are
+    also held decoded in an in-process LRU, so repeat analyses of the same
+    RFP skip SQLite and decoding too. With path=None only the LRU is used.
+    """
+
+    def __init__(self, path: Optional[str], max_memory: int = MEMORY_CACHE_ENTRIES):
+        self.path       = path
+        self.max_memory = max_memory
+        self._memory: "OrderedDict[str, _BriefStruct]" = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, brief: _BriefStruct) -> None:
+        """Insert into the LRU (caller holds the lock), evicting the oldest entry at capacity."""
+        self._memory[key] = brief
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _get_conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS briefs (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        return self._conn
+
+    def get(self, key: str) -> Optional[_BriefStruct]:
+        with self._lock:
+            brief = self._memory.get(key)
+            if brief is not None:
+                self._memory.move_to_end(key)
+                return brief
+        if self.path is None:
+            return None
+        try:
+            with self._lock:
+                row = self._get_conn().execute("SELECT value FROM briefs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            brief = _BRIEF_DECODER.decode(row[0])
+        except (sqlite3.Error, msgspec.DecodeError) as e:
+            print(f"Intake cache read failed: {e}")
+            return None
+        with self._lock:
+            self._remember(key, brief)
+        return brief
+
+    def put(self, key: str, brief: _BriefStruct) -> None:
+        with self._lock:
+            self._remember(key, brief)
+        if self.path is None:
+            return
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO briefs (key, value) VALUES (?, ?)",
+                    (key, msgspec.json.encode(brief)),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Intake cache write failed: {e}")
+
+
+# ── TEXT CLEANUP ──────────────────────────────────────────────────────────────
+
+class _NonPrintableTable(dict):
+    """
+    str.translate table that deletes non-printable characters (keeping newlines and tabs).
+    Filled lazily per code point, so only characters actually seen are classified
+    instead of building a 1.1M-entry table at import time.
+    """
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        value = codepoint if (char.isprintable() or char in "\n\r\t") else None
+        self[codepoint] = value
+        return value
+
+
+_CLEAN_TABLE = _NonPrintableTable()
+for _codepoint in range(128):   # pre-classify ASCII; CPython's translate has a fast path for it
+    _CLEAN_TABLE[_codepoint]
+del _codepoint
+
+
+def _clean_for_llm(text: str) -> str:
+    """Strip control/non-printable characters from extracted text in C via str.translate."""
+    return text.translate(_CLEAN_TABLE)
+
+
+# ── MERGE HELPERS ─────────────────────────────────────────────────────────────
+
+def _build_brief(master: _BriefStruct) -> RFPBrief:
+    """Finalize the merged struct into the public RFPBrief without re-validating trusted data."""
+    data = msgspec.structs.asdict(master)
+    # asdict is shallow: copy the lists so callers can't mutate the cached struct
+    for name, value in data.items():
+        if isinstance(value, list):
+            data[name] = list(value)
+    data["evaluation_criteria"] = [
+        EvaluationCriterion.model_construct(criterion=c.criterion, weight=c.weight)
+        for c in master.evaluation_criteria
+    ]
+    data["mandatory_documents"] = [
+        MandatoryDocument.model_construct(document_name=d.document_name, description=d.description)
+        for d in master.mandatory_documents
+    ]
+    return RFPBrief.model_construct(**data)
+
+
+def _record_usage(totals: dict, completion) -> None:
+    """Accumulate prompt / cached-prompt token counts from a completion's usage block."""
+    usage = getattr(completion, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    totals["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+    totals["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+
+
+# ── SECTION DIGEST ────────────────────────────────────────────────────────────
+
+# Headers for the sections the brief is built from, optionally numbered ("3.1 ", "IV. ")
+_SECTION_HEADERS = re.compile(
+    r"(?im)^[ \t]*(?:[\divxIVX]+[.)]?[\d.]*[ \t]+)?"
+    r"(closing date|submission deadline|deadline|evaluation|selection criteria|award criteria"
+    r"|scope of work|terms of reference|out of scope|exclusions|mandatory documents?"
+    r"|mandatory requirements|eligibility|qualifications?|experience|certifications?"
+    r"|currency|preferenc\w*|submission|contact|duration|location)"
+)
+DIGEST_HEAD_CHARS   = 3000   # cover page: project name, client, reference number
+DIGEST_BEFORE_CHARS = 200
+DIGEST_AFTER_CHARS  = 2000
+
+
+def _section_digest(text: str) -> str:
+    """
+    Keep only the document head and a window of text around each section header,
+    merging overlapping windows. Falls back to the full text when no header is found
+    or the digest would not be meaningfully shorter.
+    """
+    spans = [(0, DIGEST_HEAD_CHARS)]
+    for match in _SECTION_HEADERS.finditer(text):
+        start = max(0, match.start() - DIGEST_BEFORE_CHARS)
+        end   = match.start() + DIGEST_AFTER_CHARS
+        if start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+
+    if len(spans) == 1:
+        return text
+    digest = "\n---\n".join(text[start:end] for start, end in spans)
+    return digest if len(digest) < 0.8 * len(text) else text
+
+
+# ── TOKENIZATION ──────────────────────────────────────────────────────────────
+
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """cl100k_base if tiktoken is installed, otherwise None (fall back to ~4 chars/token)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text, exact with tiktoken installed, estimated otherwise."""
+    enc = _get_encoding()
+    if enc is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def _token_offsets(text: str) -> List[int]:
+    """Character offset at which each token of text starts."""
+    enc = _get_encoding()
+    if enc is None:
+        return list(range(0, len(text), _CHARS_PER_TOKEN))
+    tokens = enc.encode(text, disallowed_special=())
+    _, offsets = enc.decode_with_offsets(tokens)
+    return offsets
+
+
+def _token_bounds(text: str, size: int, overlap: int) -> Iterator[tuple]:
+    """
+    Yield (char_start, char_end, n_tokens) windows of at most `size` tokens with
+    `overlap` tokens shared between neighbours. The text is tokenized once and each
+    window's right edge is pulled back to the last paragraph break in its second half.
+    """
+    offsets = _token_offsets(text)
+    n       = len(offsets)
+    if n == 0:
+        return
+
+    start = 0
+    while True:
+        end      = min(start + size, n)
+        char_end = offsets[end] if end < n else len(text)
+        if end < n:
+            brk = text.rfind("\n\n", offsets[start + (end - start) // 2], char_end)
+            if brk != -1:
+                char_end = brk + 2
+                end      = bisect_left(offsets, char_end, start + 1, end)
+        yield offsets[start], char_end, end - start
+        if end >= n:
+            return
+        start = max(end - overlap, start + 1)
+
+
+# ── RATE LIMITING ─────────────────────────────────────────────────────────────
+
+def _tokens_per_minute(model: str) -> int:
+    if "GROQ_TPM" in os.environ:
+        return TOKENS_PER_MINUTE
+    return MODEL_TOKENS_PER_MINUTE.get(model, TOKENS_PER_MINUTE)
+
+
+class _RateLimiter:
+    """
+    Spaces request starts evenly across the minute so a burst of concurrent
+    batches stays inside the provider's requests-per-minute budget, and meters
+    estimated tokens through a bucket refilled at the tokens-per-minute rate.
+
+    After each response, observe() corrects the bucket with Groq's
+    x-ratelimit-* headers, so callers only wait when the provider says the
+    next batch would not fit, and never longer than the advertised reset.
+    The advertised token limit replaces the configured one, so a paid tier's
+    larger budget is used even without GROQ_TPM.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: Optional[int] = None):
+        self.interval    = 60.0 / requests_per_minute
+        self._next       = 0.0
+        self.tpm         = tokens_per_minute
+        self._tokens     = float(tokens_per_minute or 0)
+        self._refilled   = time.monotonic()
+        self._reset_at: Optional[float] = None   # when the provider says the token budget is full again
+
+    def _token_wait(self, now: float, tokens: int) -> float:
+        """Reserve `tokens` from the bucket; returns how long the caller must wait."""
+        if not self.tpm:
+            return 0.0
+        rate           = self.tpm / 60.0
+        self._tokens   = min(self.tpm, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        self._tokens  -= min(tokens, self.tpm)
+        if self._tokens >= 0:
+            return 0.0
+        wait = -self._tokens / rate
+        if self._reset_at is not None and self._reset_at > now:
+            wait = min(wait, self._reset_at - now)
+        return wait
+
+    async def acquire(self, tokens: int = 0):
+        now        = time.monotonic()
+        start_at   = max(now, self._next, now + self._token_wait(now, tokens))
+        self._next = start_at + self.interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    def observe(self, headers) -> None:
+        """Sync the token bucket with x-ratelimit-limit-tokens / -remaining-tokens / -reset-tokens."""
+        # (The -requests headers are per day on Groq, so they don't touch the per-minute spacing)
+        limit     = _header_number(headers, "x-ratelimit-limit-tokens")
+        remaining = _header_number(headers, "x-ratelimit-remaining-tokens")
+        reset_in  = _parse_duration(headers.get("x-ratelimit-reset-tokens"))
+        now       = time.monotonic()
+        if limit and int(limit) != self.tpm:
+            # The bucket was metered against the wrong budget; start over from what Groq reports
+            self.tpm, self._tokens, self._refilled = int(limit), float(limit), now
+        if remaining is not None and self.tpm:
+            self._token_wait(now, 0)   # bring the bucket up to date first
+            self._tokens = min(self._tokens, remaining)
+        if reset_in is not None:
+            self._reset_at = now + reset_in
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNIT = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset headers such as '7.66s', '2m59.56s' or '120ms' into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return _header_number({"v": value}, "v")
+    return sum(float(n) * _DURATION_UNIT[unit] for n, unit in parts)
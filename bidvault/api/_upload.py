@@ -0,0 +1,37 @@
+"""
+api/_upload.py
+──────────────
+Spools an UploadFile to a temp file on disk without blocking the event loop.
+
+Usage:
+    tmp_path = await save_upload(file, suffix=".pdf")
+    try:
+        ...
+    finally:
+        os.unlink(tmp_path)
+"""
+
+import os
+import tempfile
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+
+UPLOAD_CHUNK_SIZE = 1 << 20     # 1 MB per read/write (shutil.copyfileobj uses 16 KB)
+
+
+async def save_upload(file: UploadFile, suffix: str = "") -> str:
+    """
+    Copy the upload to a new temp file and return its path (caller deletes it).
+    Reads go through UploadFile's async read(); writes run in the threadpool.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(tmp.write, chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
@@ -9,19 +9,19 @@ Mount this router in your main FastAPI app:
 """
 
 import os
-import tempfile
-import shutil
 from typing import Optional, Annotated
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from bidvault.ingestion.pipeline   import IngestionPipeline, IngestionRequest, IngestionResult
 from bidvault.ingestion.sharepoint import SharePointConnector
-from bidvault.ingestion.vector_store import VectorStore
+from bidvault.api._upload          import save_upload
 
 
-router   = APIRouter()
+router   = APIRouter(default_response_class=ORJSONResponse)   # orjson-encoded bodies
 pipeline = IngestionPipeline()
 
 
@@ -65,6 +65,7 @@ class SearchResult(BaseModel):
 
 @router.post("/upload", response_model=IngestResponse)
 async def ingest_upload(
+    background_tasks: BackgroundTasks,
     file:        UploadFile    = File(...),
     source_type: str           = Form("other"),
     sector:      str           = Form(""),
@@ -73,6 +74,7 @@ async def ingest_upload(
     client:      str           = Form(""),
     won:         Optional[bool]= Form(None),
     document_id: str           = Form(""),
+    replace:     bool          = Form(False),
 ):
     """
     Upload a document file and ingest it into the vector store.
@@ -86,6 +88,10 @@ async def ingest_upload(
       -F "donor=usaid" \\
       -F "year=2023" \\
       -F "won=true"
+
+    With document_id and replace=true, the document's existing chunks are
+    replaced by the new ones once they are all stored (re-index); a failed
+    ingest leaves the existing chunks in place.
     """
     # Validate file type
     allowed_extensions = {".pdf", ".docx", ".doc", ".txt"}
@@ -99,9 +105,7 @@ async def ingest_upload(
     # Save to temp file
     tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
+        tmp_path = await save_upload(file, suffix=file_ext)
 
         request = IngestionRequest(
             file_path   = tmp_path,
@@ -112,9 +116,14 @@ async def ingest_upload(
             client      = client,
             won         = won,
             document_id = document_id,
+            replace_existing = replace and bool(document_id),
         )
 
-        result = pipeline.ingest(request)
+        # Extraction, embedding and the DB writes all block — run them in the threadpool
+        result = await run_in_threadpool(pipeline.ingest, request)
+        if result.success:
+            # Refresh /stats after the response is sent
+            background_tasks.add_task(pipeline.refresh_stats)
 
         return IngestResponse(
             success           = result.success,
@@ -162,13 +171,7 @@ async def search_documents(request: SearchRequest):
       "top_k": 5
     }
     """
-    from bidvault.ingestion.embedder     import Embedder
-    from bidvault.ingestion.vector_store import VectorStore, SearchFilters
-
-    embedder     = Embedder()
-    vector_store = VectorStore()
-
-    query_embedding = embedder.embed(request.query)
+    from bidvault.ingestion.vector_store import SearchFilters
 
     filters = SearchFilters(
         source_type  = request.source_type,
@@ -178,7 +181,12 @@ async def search_documents(request: SearchRequest):
         won_only     = request.won_only,
     )
 
-    chunks = vector_store.search(query_embedding, filters=filters, top_k=request.top_k)
+    # Reuse the pipeline's embedder (model loaded once) and store instead of building new ones.
+    # search_text batches the embeddings of concurrent queries into one model call
+    # and runs the blocking embed and DB work off the event loop.
+    chunks = await pipeline.vector_store.search_text(
+        request.query, embedder=pipeline.embedder, filters=filters, top_k=request.top_k
+    )
 
     return [
         SearchResult(
@@ -199,6 +207,5 @@ async def search_documents(request: SearchRequest):
 
 @router.get("/stats")
 async def ingestion_stats():
-    """Return counts of indexed documents by source type and sector."""
-    vector_store = VectorStore()
-    return vector_store.stats()
+    """Return counts of indexed documents by source type and sector (as of the last ingest / sync)."""
+    return pipeline.vector_store.stats()
@@ -11,57 +11,48 @@ Mount in main.py:
 Example curl:
     curl -X POST http://localhost:8000/api/intake/analyze \\
       -F "file=@GIPF-RFP.pdf"
+
+With BIDVAULT_BATCH=groq, /analyze queues the RFP on Groq's Batch API and
+returns 202 with a job_id; poll GET /api/intake/jobs/{job_id} for the brief.
+Jobs are held in process memory: run a single worker in batch mode, and
+fetch results within BIDVAULT_JOB_TTL seconds (default 1h) of completion.
 """
 
 import os
-import shutil
-import tempfile
+from functools import lru_cache
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
 
 from bidvault.ingestion.detector  import detect
 from bidvault.ingestion.extractor import extract
 from bidvault.agents.intake       import IntakeAgent, RFPBrief
+from bidvault.agents.batch        import batch_mode_enabled, create_job, get_job, run_brief_job
+from bidvault.api._upload         import save_upload
 
 
-router = APIRouter()
-
-
-# ── RESPONSE MODEL ────────────────────────────────────────────────────────────
+router = APIRouter(default_response_class=ORJSONResponse)   # orjson-encoded bodies
 
-class EvaluationCriterionOut(BaseModel):
-    criterion: str
-    weight: Optional[str]
 
-class MandatoryDocumentOut(BaseModel):
-    document_name: str
-    description: Optional[str]
-
-class BidBriefResponse(BaseModel):
-    project_name:         str
-    client:               str
-    reference_number:     Optional[str]
-    deadline:             Optional[str]
-    summary:              str
-    evaluation_criteria:  List[EvaluationCriterionOut]
-    mandatory_documents:  List[MandatoryDocumentOut]
-    technical_threshold:  Optional[str]
-    contact_person:       Optional[str]
-    submission_method:    Optional[str]
+@lru_cache(maxsize=1)
+def get_agent() -> IntakeAgent:
+    """One IntakeAgent per process, created on first use (so import works without GROQ_API_KEY)."""
+    return IntakeAgent()
 
 
 # ── ENDPOINTS ─────────────────────────────────────────────────────────────────
 
-@router.post("/analyze", response_model=BidBriefResponse)
-async def analyze_rfp(file: UploadFile = File(...)):
+@router.post("/analyze", response_model=RFPBrief)
+async def analyze_rfp(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload an RFP document (PDF, DOCX, or TXT) and receive a structured Bid Brief.
     The document is NOT stored in the vector database — it is analyzed in-memory only.
 
     Returns:
-        BidBriefResponse: structured extraction of the RFP's key requirements.
+        RFPBrief: structured extraction of the RFP's key requirements,
+        or 202 + job_id when batch mode (BIDVAULT_BATCH=groq) is on.
     """
     allowed_extensions = {".pdf", ".docx", ".doc", ".txt"}
     file_ext = os.path.splitext(file.filename or "")[1].lower()
@@ -75,13 +66,12 @@ async def analyze_rfp(file: UploadFile = File(...)):
     # Save to a temp file for processing
     tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
+        tmp_path = await save_upload(file, suffix=file_ext)
 
         # Extract text via the existing pipeline modules
-        detection  = detect(tmp_path)
-        extraction = extract(tmp_path, detection)
+        # Detection / extraction are blocking (pdfplumber, OCR) — keep them off the event loop
+        detection  = await run_in_threadpool(detect, tmp_path)
+        extraction = await run_in_threadpool(extract, tmp_path, detection)
 
         if extraction.char_count < 100:
             raise HTTPException(
@@ -89,34 +79,41 @@ async def analyze_rfp(file: UploadFile = File(...)):
                 detail="Could not extract meaningful text from document. It may be encrypted or a low-quality scan."
             )
 
+        # Batch mode: queue on Groq's Batch API and let the client poll for the result
+        if batch_mode_enabled():
+            job_id = create_job()
+            background_tasks.add_task(run_brief_job, job_id, extraction.text)
+            return JSONResponse(status_code=202, content={
+                "job_id":     job_id,
+                "status":     "queued",
+                "status_url": f"/api/intake/jobs/{job_id}",
+            })
+
         # Run the Intake Agent (no DB storage — analyze only)
-        agent = IntakeAgent()
-        brief = agent.extract_brief(extraction.text)
-
-        return BidBriefResponse(
-            project_name        = brief.project_name,
-            client              = brief.client,
-            reference_number    = brief.reference_number,
-            deadline            = brief.deadline,
-            summary             = brief.summary,
-            evaluation_criteria = [
-                EvaluationCriterionOut(criterion=c.criterion, weight=c.weight)
-                for c in brief.evaluation_criteria
-            ],
-            mandatory_documents = [
-                MandatoryDocumentOut(document_name=d.document_name, description=d.description)
-                for d in brief.mandatory_documents
-            ],
-            technical_threshold = brief.technical_threshold,
-            contact_person      = brief.contact_person,
-            submission_method   = brief.submission_method,
-        )
+        brief = await get_agent().extract_brief_async(extraction.text)
+
+        return brief
 
     finally:
         if tmp_path and os.path.exists(tmp_path):
             os.unlink(tmp_path)
 
 
+@router.get("/jobs/{job_id}")
+async def get_brief_job(job_id: str):
+    """Status of a batch-mode /analyze job; includes the brief once completed."""
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+
+    result = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == "completed":
+        result["brief"] = job["brief"]
+    elif job["status"] == "failed":
+        result["error"] = job["error"]
+    return result
+
+
 @router.post("/extract-custom")
 async def extract_custom_fields(
     file: UploadFile = File(...),
@@ -136,15 +133,13 @@ async def extract_custom_fields(
 
     tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
+        tmp_path = await save_upload(file, suffix=file_ext)
 
-        detection  = detect(tmp_path)
-        extraction = extract(tmp_path, detection)
+        # Detection / extraction are blocking (pdfplumber, OCR) — keep them off the event loop
+        detection  = await run_in_threadpool(detect, tmp_path)
+        extraction = await run_in_threadpool(extract, tmp_path, detection)
 
-        agent = IntakeAgent()
-        data  = agent.custom_extract(extraction.text, field_list, custom_prompt)
+        data = await get_agent().custom_extract_async(extraction.text, field_list, custom_prompt)
         
         return {"filename": file.filename, "extracted": data}
 
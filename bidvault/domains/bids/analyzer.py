@@ -9,6 +9,7 @@ from enum import Enum
 from typing import Optional, List
 import re
 from collections import Counter
+from functools import lru_cache
 import datetime
 
 # ── ENUMS ─────────────────────────────────────────────────────────────────────
@@ -95,16 +96,35 @@ BID_SECTION_PATTERNS = {
 
 # ── LOGIC ───────────────────────────────────────────────────────────────────
 
-def auto_tag_sector(text: str) -> str:
-    text_lower = text.lower()
+_RE_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+
+def auto_tag_sector(text: str, text_lower: Optional[str] = None) -> str:
+    text_lower = text.lower() if text_lower is None else text_lower
+    automaton  = _keyword_automaton("sector")
+    if automaton is not None:
+        counts = _count_keywords(automaton, text_lower)
+        scores = {}
+        for sector, keywords in SECTOR_KEYWORDS.items():
+            score = sum(counts[kw] for kw in keywords)
+            if score > 0: scores[sector] = score
+        return max(scores, key=scores.get) if scores else Sector.GENERAL
+
     scores = {}
     for sector, keywords in SECTOR_KEYWORDS.items():
         score = sum(text_lower.count(kw) for kw in keywords)
         if score > 0: scores[sector] = score
     return max(scores, key=scores.get) if scores else Sector.GENERAL
 
-def auto_tag_donor(text: str) -> str:
-    text_lower = text.lower()
+def auto_tag_donor(text: str, text_lower: Optional[str] = None) -> str:
+    text_lower = text.lower() if text_lower is None else text_lower
+    automaton  = _keyword_automaton("donor")
+    if automaton is not None:
+        found = {kw for _, kw in automaton.iter(text_lower)}
+        for donor, keywords in DONOR_KEYWORDS.items():
+            if any(kw in found for kw in keywords):
+                return donor
+        return Donor.OTHER
+
     for donor, keywords in DONOR_KEYWORDS.items():
         if any(kw in text_lower for kw in keywords):
             return donor
@@ -112,9 +132,13 @@ def auto_tag_donor(text: str) -> str:
 
 def extract_year(text: str) -> int:
     current_year = datetime.datetime.now().year
-    years = re.findall(r"\b(19\d{2}|20\d{2})\b", text[:5000])
-    if not years: return current_year
-    year_counts = Counter([int(y) for y in years if 1990 <= int(y) <= current_year + 1])
+    # Stream matches from the first 5000 chars straight into the Counter
+    # (endpos bounds the scan without slicing; \b treats it as end of text)
+    year_counts = Counter()
+    for m in _RE_YEAR.finditer(text, 0, 5000):
+        year = int(m.group())
+        if 1990 <= year <= current_year + 1:
+            year_counts[year] += 1
     return year_counts.most_common(1)[0][0] if year_counts else current_year
 
 class BidAnalyzer:
@@ -126,14 +150,15 @@ class BidAnalyzer:
         discovered via bid-specific heuristics.
         """
         extra = {}
+        text_lower = text.lower()    # shared by the keyword taggers below
         
         # Sector auto-tagging
         if not initial_meta.get("sector") or initial_meta.get("sector") == "general":
-            extra["sector"] = auto_tag_sector(text)
+            extra["sector"] = auto_tag_sector(text, text_lower)
         
         # Donor auto-tagging
         if not initial_meta.get("donor") or initial_meta.get("donor") == "other":
-            extra["donor"] = auto_tag_donor(text)
+            extra["donor"] = auto_tag_donor(text, text_lower)
             
         # Year extraction
         if not initial_meta.get("year"):
@@ -143,8 +168,75 @@ class BidAnalyzer:
 
     def infer_section_type(self, hint: str) -> str:
         """Maps a heading to a bid-related section type."""
-        hint_lower = hint.lower()
-        for pattern, section_type in BID_SECTION_PATTERNS.items():
-            if pattern in hint_lower:
-                return section_type
-        return "general"
+        return infer_bid_section_type(hint)
+
+
+@lru_cache(maxsize=2)
+def _keyword_automaton(table: str):
+    """
+    Aho-Corasick automaton over every keyword of SECTOR_KEYWORDS ("sector") or
+    DONOR_KEYWORDS ("donor"), so a document is scanned once instead of once
+    per keyword. None when pyahocorasick is not installed.
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    keywords  = SECTOR_KEYWORDS if table == "sector" else DONOR_KEYWORDS
+    automaton = ahocorasick.Automaton()
+    for kws in keywords.values():
+        for kw in kws:
+            automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def _count_keywords(automaton, text: str) -> Counter:
+    """
+    Occurrences of each keyword in text, counted like str.count (an
+    occurrence overlapping the previous one of the same keyword is skipped).
+    """
+    counts   = Counter()
+    last_end = {}
+    for end, kw in automaton.iter(text):
+        if end - len(kw) < last_end.get(kw, -1):
+            continue
+        last_end[kw] = end
+        counts[kw] += 1
+    return counts
+
+
+@lru_cache(maxsize=1)
+def _section_automaton():
+    """
+    Aho-Corasick automaton over BID_SECTION_PATTERNS, or None when the optional
+    pyahocorasick package is not installed (pip install pyahocorasick).
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    automaton = ahocorasick.Automaton()
+    for priority, (pattern, section_type) in enumerate(BID_SECTION_PATTERNS.items()):
+        automaton.add_word(pattern, (priority, section_type))
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=4096)
+def infer_bid_section_type(hint: str) -> str:
+    """
+    First BID_SECTION_PATTERNS entry (in dict order) found in the heading.
+    Cached per hint — every chunk of a section carries the same one.
+    """
+    hint_lower = hint.lower()
+    automaton  = _section_automaton()
+    if automaton is not None:
+        # One pass over the hint; dict order still decides between several hits
+        hits = [match for _, match in automaton.iter(hint_lower)]
+        return min(hits)[1] if hits else "general"
+
+    for pattern, section_type in BID_SECTION_PATTERNS.items():
+        if pattern in hint_lower:
+            return section_type
+    return "general"
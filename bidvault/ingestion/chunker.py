@@ -18,7 +18,7 @@ which is used to set the section_type metadata field.
 
 import re
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterator, Optional
 
 
 # Chunk size targets (in characters — approximating tokens at ~4 chars/token)
@@ -27,16 +27,26 @@ CHUNK_OVERLAP  = 300    # ~75 tokens — ensures context continuity at boundarie
 MIN_CHUNK_SIZE = 200    # Discard chunks smaller than this
 
 
-@dataclass
+# Compiled once at import — these run for every ingested document
+_HEADING_ANY   = re.compile(r"\[H[123]\]")
+_HEADING_SPLIT = re.compile(r"(\[H[123]\][^\n]*\n)")
+_HEADING_PARSE = re.compile(r"\[H([123])\] (.*)\n")
+_PARA_SPLIT    = re.compile(r"\n\n+")
+
+# Sentence ends the token splitter may break after (punctuation + space or newline)
+_SENT_ENDS = (". ", "! ", "? ", ".\n", "!\n", "?\n")
+
+
+@dataclass(slots=True)
 class Chunk:
     text: str
     index: int                          # position in document (0-based)
     section_hint: str = ""              # nearest heading before this chunk
     chunk_method: str = ""              # which splitting strategy was used
-    char_count: int = 0
 
-    def __post_init__(self):
-        self.char_count = len(self.text)
+    @property
+    def char_count(self) -> int:
+        return len(self.text)
 
 
 def chunk(text: str, source_type: str = "unknown") -> list[Chunk]:
@@ -47,16 +57,22 @@ def chunk(text: str, source_type: str = "unknown") -> list[Chunk]:
     if not text or not text.strip():
         return []
 
+    # Decide up front which splitters can apply, so text with no markers or
+    # paragraph breaks goes straight to the token splitter
+    has_headings   = _has_heading_markers(text)
+    has_paragraphs = "\n\n" in text
+
     # Try structure-aware first (Word docs with headings)
-    if _has_heading_markers(text):
+    if has_headings:
         chunks = _structure_aware_split(text)
         if len(chunks) >= 2:
             return _assign_indices(chunks, "structure_aware")
 
     # Try paragraph-based (clean PDFs)
-    chunks = _paragraph_split(text)
-    if len(chunks) >= 2:
-        return _assign_indices(chunks, "paragraph")
+    if has_paragraphs:
+        chunks = _paragraph_split(text)
+        if len(chunks) >= 2:
+            return _assign_indices(chunks, "paragraph")
 
     # Fall back to token-based with overlap
     chunks = _token_split(text)
@@ -66,7 +82,7 @@ def chunk(text: str, source_type: str = "unknown") -> list[Chunk]:
 # ── STRATEGY 1: STRUCTURE-AWARE ───────────────────────────────────────────────
 
 def _has_heading_markers(text: str) -> bool:
-    return bool(re.search(r"\[H[123]\]", text))
+    return _HEADING_ANY.search(text) is not None
 
 
 def _structure_aware_split(text: str) -> list[Chunk]:
@@ -75,36 +91,38 @@ def _structure_aware_split(text: str) -> list[Chunk]:
     Each heading starts a new chunk. If a section is too long,
     it gets further split by token-based method.
     """
-    # Split on heading markers, keeping the marker with its section
-    parts = re.split(r"(\[H[123]\][^\n]*\n)", text)
+    chunks = []
+    for heading, section in _iter_sections(text):
+        section = section.strip()
+        if section:
+            chunks.extend(_split_if_too_long(section, heading))
 
-    chunks   = []
+    return [c for c in chunks if len(c.text.strip()) >= MIN_CHUNK_SIZE]
+
+
+def _iter_sections(text: str) -> Iterator[tuple[str, str]]:
+    """
+    Yield (heading, section_text) pairs, each section starting at its heading
+    marker line. Text before the first heading comes with heading "".
+    Walks the markers with finditer and slices once per section.
+    """
     current_heading = ""
-    current_text    = ""
-
-    for part in parts:
-        heading_match = re.match(r"\[H([123])\] (.*)\n", part)
-
-        if heading_match:
-            # Save previous section before starting new one
-            if current_text.strip():
-                chunks.extend(
-                    _split_if_too_long(current_text.strip(), current_heading)
-                )
-            level   = heading_match.group(1)
-            heading = heading_match.group(2).strip()
-            current_heading = f"H{level}: {heading}"
-            current_text    = part
-        else:
-            current_text += part
+    section_start   = 0
 
-    # Don't forget the last section
-    if current_text.strip():
-        chunks.extend(
-            _split_if_too_long(current_text.strip(), current_heading)
-        )
+    for marker in _HEADING_SPLIT.finditer(text):
+        heading_match = _HEADING_PARSE.match(marker.group(1))
+        if not heading_match:
+            continue    # e.g. "[H1]Title" with no space — stays part of the section text
 
-    return [c for c in chunks if len(c.text.strip()) >= MIN_CHUNK_SIZE]
+        # Save previous section before starting new one
+        yield current_heading, text[section_start:marker.start()]
+        level   = heading_match.group(1)
+        heading = heading_match.group(2).strip()
+        current_heading = f"H{level}: {heading}"
+        section_start   = marker.start()
+
+    # Don't forget the last section
+    yield current_heading, text[section_start:]
 
 
 # ── STRATEGY 2: PARAGRAPH-BASED ──────────────────────────────────────────────
@@ -114,10 +132,11 @@ def _paragraph_split(text: str) -> list[Chunk]:
     Split on double newlines (paragraph breaks).
     Groups short paragraphs together to hit the target chunk size.
     """
-    paragraphs = re.split(r"\n\n+", text)
+    paragraphs = _PARA_SPLIT.split(text)
 
     chunks        = []
-    current_text  = ""
+    current_parts = []      # paragraphs of the chunk being built
+    current_len   = 0       # running length, so the buffer is never re-measured
     current_hint  = ""
 
     for para in paragraphs:
@@ -127,20 +146,23 @@ def _paragraph_split(text: str) -> list[Chunk]:
 
         # Detect if this paragraph looks like a heading
         if _looks_like_heading(para):
-            if current_text.strip():
-                chunks.append(Chunk(text=current_text.strip(), index=0, section_hint=current_hint))
-            current_hint = para
-            current_text = para + "\n\n"
+            if current_parts:
+                chunks.append(Chunk(text="\n\n".join(current_parts), index=0, section_hint=current_hint))
+            current_hint  = para
+            current_parts = [para]
+            current_len   = len(para) + 2
         else:
-            current_text += para + "\n\n"
+            current_parts.append(para)
+            current_len += len(para) + 2
             # Flush when we've hit the target size
-            if len(current_text) >= CHUNK_SIZE:
-                chunks.append(Chunk(text=current_text.strip(), index=0, section_hint=current_hint))
+            if current_len >= CHUNK_SIZE:
+                chunks.append(Chunk(text="\n\n".join(current_parts), index=0, section_hint=current_hint))
                 # Keep last paragraph as overlap context
-                current_text = para + "\n\n"
+                current_parts = [para]
+                current_len   = len(para) + 2
 
-    if current_text.strip():
-        chunks.append(Chunk(text=current_text.strip(), index=0, section_hint=current_hint))
+    if current_parts:
+        chunks.append(Chunk(text="\n\n".join(current_parts), index=0, section_hint=current_hint))
 
     return [c for c in chunks if len(c.text.strip()) >= MIN_CHUNK_SIZE]
 
@@ -151,13 +173,19 @@ def _looks_like_heading(text: str) -> bool:
     and is not all lowercase is probably a heading or section title.
     """
     text = text.strip()
-    if len(text) > 120:
+    if not text or len(text) > 120:
         return False
     if text.endswith((".", ",", ";")):
         return False
-    if text == text.lower():
-        return False
-    return bool(re.match(r"^[A-Z0-9]", text))
+    # Starts with an ASCII capital or digit (plain comparisons, no regex call).
+    # A leading capital already proves the text isn't all lowercase, so only
+    # digit-led text pays for the text.lower() copy.
+    first = text[0]
+    if "A" <= first <= "Z":
+        return True
+    if "0" <= first <= "9":
+        return text != text.lower()
+    return False
 
 
 # ── STRATEGY 3: TOKEN-BASED ───────────────────────────────────────────────────
@@ -167,20 +195,27 @@ def _token_split(text: str, heading: str = "") -> list[Chunk]:
     Naive sliding window split. Last resort for dense unstructured text.
     Tries to split at sentence boundaries within the window.
     """
-    chunks = []
-    start  = 0
+    chunks   = []
+    start    = 0
+    text_len = len(text)
 
-    while start < len(text):
+    while start < text_len:
         end = start + CHUNK_SIZE
 
-        if end < len(text):
+        if end < text_len:
             # Try to find a sentence boundary to split cleanly
             boundary = _find_sentence_boundary(text, end)
             end = boundary if boundary else end
 
-        chunk_text = text[start:end].strip()
-        if len(chunk_text) >= MIN_CHUNK_SIZE:
-            chunks.append(Chunk(text=chunk_text, index=0, section_hint=heading))
+        # Trim surrounding whitespace by moving the bounds, so each chunk is
+        # sliced once (same result as text[start:end].strip())
+        lo, hi = start, min(end, text_len)
+        while lo < hi and text[lo].isspace():
+            lo += 1
+        while hi > lo and text[hi - 1].isspace():
+            hi -= 1
+        if hi - lo >= MIN_CHUNK_SIZE:
+            chunks.append(Chunk(text=text[lo:hi], index=0, section_hint=heading))
 
         # Move forward by chunk size minus overlap
         start += (CHUNK_SIZE - CHUNK_OVERLAP)
@@ -191,12 +226,9 @@ def _token_split(text: str, heading: str = "") -> list[Chunk]:
 def _find_sentence_boundary(text: str, pos: int, search_window: int = 200) -> Optional[int]:
     """Find the nearest sentence end (. ! ?) near pos, searching backwards."""
     search_start = max(0, pos - search_window)
-    segment      = text[search_start:pos]
-    matches      = list(re.finditer(r"[.!?]\s", segment))
-    if matches:
-        last_match = matches[-1]
-        return search_start + last_match.end()
-    return None
+    # Bounded rfind on the text itself — no slice, no regex engine
+    best = max(text.rfind(end, search_start, pos) for end in _SENT_ENDS)
+    return best + 2 if best >= 0 else None
 
 
 # ── UTILITIES ─────────────────────────────────────────────────────────────────
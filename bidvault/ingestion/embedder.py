@@ -14,11 +14,56 @@ ENVIRONMENT VARIABLES:
   
   # For OpenAI:
   OPENAI_API_KEY
+
+  EMBEDDING_MAX_CONCURRENCY — cloud batches in flight at once (default 35)
+  OPENAI_USAGE_TIER         — account tier (1-5) that sets the request/token
+                              budgets below (default 1)
+  EMBEDDING_RPM / EMBEDDING_TPM — override those budgets directly
+  EMBEDDING_CACHE_PATH      — SQLite file for cached vectors
+                              (default .bidvault_cache/embeddings.sqlite3; "" disables)
 """
 
+import array
+import asyncio
+import base64
+import hashlib
 import os
+import sqlite3
+import sys
+import threading
 import time
-from typing import Optional, List
+import weakref
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Optional, List
+
+
+# Cloud providers: texts per embeddings request, and requests in flight at once
+BATCH_SIZE      = 100
+MAX_CONCURRENCY = int(os.environ.get("EMBEDDING_MAX_CONCURRENCY", "35"))
+
+# Local (fastembed): texts per ONNX batch, and the input size from which
+# fastembed's multi-process data-parallel mode is used (parallel=0: all cores)
+LOCAL_BATCH_SIZE          = 256
+LOCAL_PARALLEL_MIN_TEXTS  = 2048
+
+# OpenAI embedding-model limits per usage tier: (requests/min, tokens/min)
+USAGE_TIER_LIMITS = {
+    "1": (3_000,  1_000_000),
+    "2": (5_000,  1_000_000),
+    "3": (5_000,  5_000_000),
+    "4": (10_000, 5_000_000),
+    "5": (10_000, 10_000_000),
+}
+_TIER_RPM, _TIER_TPM = USAGE_TIER_LIMITS.get(os.environ.get("OPENAI_USAGE_TIER", "1"), USAGE_TIER_LIMITS["1"])
+REQUESTS_PER_MINUTE  = int(os.environ.get("EMBEDDING_RPM", _TIER_RPM))
+TOKENS_PER_MINUTE    = int(os.environ.get("EMBEDDING_TPM", _TIER_TPM))
+
+# Vectors are cached by (provider, model, dimensions, text), so re-ingesting
+# boilerplate (company profile, CVs, methodology library) skips the model
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH", os.path.join(".bidvault_cache", "embeddings.sqlite3")
+)
 
 
 class Embedder:
@@ -31,11 +76,14 @@ class Embedder:
         self,
         provider:   Optional[str] = None,
         model_name: Optional[str] = None,
+        cache_path: Optional[str] = EMBEDDING_CACHE_PATH,
     ):
         self.provider = provider or os.environ.get("EMBEDDING_PROVIDER", "local").lower()
         
         # Default models for each provider
         if self.provider == "local":
+            # fastembed serves this model from its int8-quantized ONNX export
+            # (qdrant/bge-small-en-v1.5-onnx-q, ~67 MB), not the FP32 weights
             self.model_name = model_name or "BAAI/bge-small-en-v1.5"
             self.dimensions = 384
         else:
@@ -43,17 +91,20 @@ class Embedder:
             self.dimensions = 3072
 
         self._client = None
+        # Async clients are bound to the event loop they first run on (the sync
+        # embed_batch uses asyncio.run, i.e. a new loop per call), so keep one per loop
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        # Shared across calls, so back-to-back documents stay inside one budget
+        self._limiter = _RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+        self.cache    = EmbeddingCache(cache_path) if cache_path else None
+        self._key_prefix = None
 
     def _get_client(self):
         if self._client is not None:
             return self._client
 
         if self.provider == "local":
-            try:
-                from fastembed import TextEmbedding
-                self._client = TextEmbedding(model_name=self.model_name)
-            except ImportError:
-                raise ImportError("Run: pip install fastembed")
+            self._client = _get_fastembed(self.model_name)
         
         elif self.provider == "azure":
             from openai import AzureOpenAI
@@ -69,36 +120,359 @@ class Embedder:
 
         return self._client
 
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        if loop in self._async_clients:
+            return self._async_clients[loop]
+
+        if self.provider == "azure":
+            from openai import AsyncAzureOpenAI
+            client = AsyncAzureOpenAI(
+                api_key       = os.environ["AZURE_OPENAI_API_KEY"],
+                azure_endpoint= os.environ["AZURE_OPENAI_ENDPOINT"],
+                api_version   = "2024-02-01",
+            )
+        else: # Standard OpenAI
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+
+        self._async_clients[loop] = client
+        return client
+
     def embed(self, text: str) -> List[float]:
         """Embed a single string."""
         return self.embed_batch([text])[0]
 
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Embed a list of strings."""
-        client = self._get_client()
-        
-        if self.provider == "local":
+        """Embed a list of strings. Cached vectors are reused; only new texts hit the model."""
+        if self.provider != "local":
+            # Cloud Providers (OpenAI/Azure)
+            return asyncio.run(self.embed_batch_async(texts))
+
+        results, misses = self._lookup(texts)
+        if misses:
+            import numpy as np
+            client = self._get_client()
+            # ONNX Runtime already spreads one batch over all cores; fastembed's
+            # data-parallel mode starts worker processes (each loading the model),
+            # which only pays off on large offline runs
+            parallel = 0 if len(misses) >= LOCAL_PARALLEL_MIN_TEXTS else None
             # fastembed returns a generator of numpy arrays
-            embeddings = list(client.embed(texts))
-            # Convert to list of lists for JSON/Postgres compatibility
-            return [e.tolist() for e in embeddings]
+            embeddings = client.embed(list(misses), batch_size=LOCAL_BATCH_SIZE, parallel=parallel)
+            # One stack + tolist for JSON/Postgres compatibility, not one conversion per vector
+            matrix = np.stack(list(embeddings)).astype(np.float32, copy=False)
+            # The cache takes each row's float32 bytes straight from the array
+            # instead of re-packing the Python float lists
+            self._store(results, misses, matrix.tolist(), packed=[row.tobytes() for row in matrix])
+        return results
 
-        # Cloud Providers (OpenAI/Azure)
-        all_embeddings = []
-        batch_size = 100
-        
-        for i in range(0, len(texts), batch_size):
-            batch = [t.strip() or "." for t in texts[i : i + batch_size]]
-            
-            response = client.embeddings.create(
-                model      = self.model_name,
-                input      = batch,
-                dimensions = self.dimensions if self.provider != "azure" else None
-            )
-            
-            batch_embeddings = [item.embedding for item in sorted(
+    async def embed_batch_async(
+        self, texts: List[str], max_concurrency: int = MAX_CONCURRENCY
+    ) -> List[List[float]]:
+        """
+        Embed a list of strings with a cloud provider. Batches of BATCH_SIZE are
+        sent concurrently (at most max_concurrency in flight); results keep input order.
+        """
+        if self.provider == "local":
+            return self.embed_batch(texts)
+
+        results, misses = self._lookup(texts)
+        if not misses:
+            return results
+
+        client    = self._get_async_client()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter   = self._limiter
+
+        async def embed_one(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                # Wait for headroom before sending instead of collecting a 429
+                # (the SDK's own retry stays as the safety net)
+                await limiter.acquire(sum(len(t) for t in batch) // 4)
+                response = await client.embeddings.create(
+                    model           = self.model_name,
+                    input           = batch,
+                    dimensions      = self.dimensions if self.provider != "azure" else None,
+                    encoding_format = "base64",   # packed float32s instead of JSON number lists
+                )
+            return [_decode_embedding(item.embedding) for item in sorted(
                 response.data, key=lambda x: x.index
             )]
-            all_embeddings.extend(batch_embeddings)
-            
-        return all_embeddings
+
+        pending = [t.strip() or "." for t in misses]
+        batches = [pending[i : i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+        batch_results = await asyncio.gather(*(embed_one(batch) for batch in batches))
+
+        embeddings = []
+        for batch_embeddings in batch_results:
+            embeddings.extend(batch_embeddings)
+        self._store(results, misses, embeddings)
+        return results
+
+    # ── CACHE ─────────────────────────────────────────────────────────────────
+
+    def _cache_key(self, text: str) -> bytes:
+        # The (provider, model, dimensions) prefix is hashed once; each key
+        # copies that state and only hashes the chunk text
+        prefix = f"{self.provider}\x00{self.model_name}\x00{self.dimensions}\x00"
+        if self._key_prefix is None or self._key_prefix[0] != prefix:
+            self._key_prefix = (prefix, hashlib.sha256(prefix.encode()))
+        h = self._key_prefix[1].copy()
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.digest()
+
+    def _lookup(self, texts: List[str]):
+        """
+        Cached vectors in input order (None where missing), plus the texts still
+        to embed, each once, mapped to every position it occupies in `texts`.
+        """
+        results = [None] * len(texts)
+        misses: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            misses.setdefault(text, []).append(i)
+
+        if self.cache is not None and misses:
+            keys  = [self._cache_key(t) for t in misses]
+            found = self.cache.get_many(keys)
+            for text, vector in zip(list(misses), found):
+                if vector is not None:
+                    for i in misses.pop(text):
+                        results[i] = vector
+        return results, misses
+
+    def _store(
+        self,
+        results:    list,
+        misses:     Dict[str, List[int]],
+        embeddings: List[List[float]],
+        packed:     Optional[List[bytes]] = None,
+    ):
+        """
+        Fan freshly computed vectors out to every position of their text and cache
+        them. `packed` optionally gives the same vectors as float32 bytes.
+        """
+        for positions, vector in zip(misses.values(), embeddings):
+            for i in positions:
+                results[i] = vector
+        if self.cache is not None:
+            if packed is None:
+                packed = [_pack_vector(vector) for vector in embeddings]
+            self.cache.put_many([
+                (self._cache_key(text), blob) for text, blob in zip(misses, packed)
+            ])
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> Embedder:
+    """
+    The process-wide default Embedder. Its model, HTTP clients, rate limiter
+    and cache connection are shared by the pipeline, the API and the scripts.
+    """
+    return Embedder()
+
+
+@lru_cache(maxsize=4)
+def _get_fastembed(model_name: str):
+    """
+    One fastembed model per process. Loading it reads the ONNX file and builds
+    an ONNX Runtime session, so Embedders created per request or per document
+    share it. (InferenceSession.run is thread-safe.)
+    """
+    try:
+        from fastembed import TextEmbedding
+    except ImportError:
+        raise ImportError("Run: pip install fastembed")
+    return TextEmbedding(model_name=model_name)
+
+
+def _decode_embedding(embedding) -> List[float]:
+    """
+    Decode a base64 embedding (little-endian float32) with the stdlib array module.
+    With encoding_format passed explicitly the SDK hands the string back as is;
+    a float list (older SDKs / proxies) is returned unchanged.
+    """
+    if not isinstance(embedding, str):
+        return embedding
+    values = array.array("f", base64.b64decode(embedding))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    SQLite key → vector store. Vectors are kept as raw float32 bytes —
+    the precision fastembed and the OpenAI/Azure models produce.
+    """
+
+    # Keys per SELECT ... IN (...); stays under SQLite's bound-parameter limit
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        self.path  = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, vec BLOB NOT NULL)")
+        return self._conn
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[List[float]]]:
+        found = {}
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                for i in range(0, len(keys), self.LOOKUP_CHUNK):
+                    chunk = keys[i : i + self.LOOKUP_CHUNK]
+                    rows  = conn.execute(
+                        f"SELECT key, vec FROM cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                    found.update(rows)
+        except sqlite3.Error as e:
+            print(f"Embedding cache read failed: {e}")
+        return [_unpack_vector(found[k]) if k in found else None for k in keys]
+
+    def put_many(self, items) -> None:
+        """items: (key, float32 bytes) pairs — see _pack_vector."""
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, vec) VALUES (?, ?)", items
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Embedding cache write failed: {e}")
+
+
+def _pack_vector(vector: List[float]) -> bytes:
+    return array.array("f", vector).tobytes()
+
+
+def _unpack_vector(blob: bytes) -> List[float]:
+    values = array.array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+# ── RATE LIMITING ─────────────────────────────────────────────────────────────
+
+class _RateLimiter:
+    """
+    Rolling 60-second windows of request start times and token counts.
+    acquire() waits until one more request of n_tokens fits under both the
+    requests-per-minute and tokens-per-minute budgets, then records it.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.rpm         = requests_per_minute
+        self.tpm         = tokens_per_minute
+        self._requests   = deque()   # start times
+        self._tokens     = deque()   # (start time, tokens)
+        self._token_sum  = 0
+        # Shared by concurrent ingests, each running its own event loop in a worker thread
+        self._lock       = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.WINDOW
+        while self._requests and self._requests[0] <= cutoff:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= cutoff:
+            self._token_sum -= self._tokens.popleft()[1]
+
+    async def acquire(self, n_tokens: int = 0) -> None:
+        n_tokens = min(n_tokens, self.tpm)   # a single oversized batch must still go through
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                request_ok = len(self._requests) < self.rpm
+                tokens_ok  = self._token_sum + n_tokens <= self.tpm
+                if request_ok and tokens_ok:
+                    self._requests.append(now)
+                    self._tokens.append((now, n_tokens))
+                    self._token_sum += n_tokens
+                    return
+
+                # Sleep until the oldest entry blocking us leaves the window
+                wait = []
+                if not request_ok:
+                    wait.append(self._requests[0])
+                if not tokens_ok:
+                    wait.append(self._tokens[0][0])
+                delay = max(0.0, min(wait) + self.WINDOW - now)
+            await asyncio.sleep(delay)
+
+
+# ── QUERY BATCHING ────────────────────────────────────────────────────────────
+
+QUERY_BATCH_WINDOW_S = 0.005   # collect concurrent queries for this long
+QUERY_BATCH_MAX      = 64      # flush early once this many are waiting
+
+
+class QueryBatcher:
+    """
+    Coalesces query embeddings that arrive within QUERY_BATCH_WINDOW_S of each
+    other into one embed_batch call, so concurrent searches share a model
+    forward instead of paying for one each. embed() resolves to the vector.
+    """
+
+    def __init__(
+        self,
+        embedder:   Optional[Embedder] = None,
+        window:     float = QUERY_BATCH_WINDOW_S,
+        max_batch:  int = QUERY_BATCH_MAX,
+    ):
+        self.embedder   = embedder or get_embedder()
+        self.window     = window
+        self.max_batch  = max_batch
+        self._pending: List[tuple] = []   # (text, future)
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> List[float]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def flush(self):
+        """Embed everything queued so far in one batch."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            # embed_batch blocks (local model, or asyncio.run for cloud providers)
+            vectors = await asyncio.to_thread(self.embedder.embed_batch, [t for t, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(pending, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+_batchers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_query_batcher(embedder: Optional[Embedder] = None) -> QueryBatcher:
+    """The QueryBatcher for the running event loop and embedder."""
+    loop     = asyncio.get_running_loop()
+    embedder = embedder or get_embedder()
+    batchers = _batchers.setdefault(loop, {})
+    if embedder not in batchers:
+        batchers[embedder] = QueryBatcher(embedder)
+    return batchers[embedder]
@@ -5,15 +5,17 @@ Extracts clean text from any supported document type.
 Routes to the right extraction method based on DetectionResult.
 
 Extraction hierarchy:
-  Digital PDF  → pdfplumber  (fast, accurate)
+  Digital PDF  → pypdfium2 text layer + pdfplumber tables  (fast, accurate)
   Scanned PDF  → pdf2image + pytesseract  (slower, OCR)
   Mixed PDF    → pdfplumber first, fall back to OCR per page
   Word         → python-docx  (preserves heading structure)
   Text         → direct read
 """
 
+import mmap
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -21,6 +23,13 @@ from typing import Optional
 from .detector import DetectionResult, DocType
 
 
+# Pages OCR'd at once. Each pytesseract call runs the tesseract binary in a
+# subprocess, so a thread pool is enough to keep every core busy. The pool
+# sets OMP_THREAD_LIMIT=1 (unless it is already set) so tesseract's own
+# OpenMP threads don't oversubscribe the cores on top of that.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 4))
+
+
 @dataclass
 class ExtractionResult:
     text: str                           # full cleaned text
@@ -61,32 +70,52 @@ def extract(file_path: str, detection: DetectionResult) -> ExtractionResult:
 # ── DIGITAL PDF ───────────────────────────────────────────────────────────────
 
 def _extract_digital_pdf(file_path: str) -> ExtractionResult:
+    """
+    Text layer via PDFium (native C, ~30x faster than pdfminer's Python parser).
+    pdfplumber only runs its table finder on pages that draw vector paths —
+    its default "lines" strategy builds tables from those ruling edges, so a
+    page without any path objects cannot yield a table.
+    """
     try:
         import pdfplumber
+        import pypdfium2
+        import pypdfium2.raw as pdfium_c
     except ImportError:
-        raise ImportError("Run: pip install pdfplumber")
+        raise ImportError("Run: pip install pdfplumber pypdfium2")
 
     pages = []
     warnings = []
+    ruled_pages = []    # indexes of pages that may contain tables
 
-    with pdfplumber.open(file_path) as pdf:
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text() or ""
-
-            # Also extract tables — common in RFP evaluation criteria sections
-            tables = page.extract_tables()
-            if tables:
-                table_text = _tables_to_text(tables)
-                text = text + "\n\n" + table_text if text else table_text
-
-            pages.append(clean_text(text))
-
-    full_text = "\n\n--- PAGE BREAK ---\n\n".join(p for p in pages if p.strip())
+    pdf = pypdfium2.PdfDocument(file_path)
+    try:
+        for i, page in enumerate(pdf):
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_bounded())
+            if any(True for _ in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH], max_depth=15)):
+                ruled_pages.append(i)
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+
+    # Also extract tables — common in RFP evaluation criteria sections
+    if ruled_pages:
+        with pdfplumber.open(file_path, pages=[i + 1 for i in ruled_pages]) as plumber:
+            for i, page in zip(ruled_pages, plumber.pages):
+                tables = page.extract_tables()
+                if tables:
+                    table_text = _tables_to_text(tables)
+                    pages[i] = pages[i] + "\n\n" + table_text if pages[i] else table_text
+                page.close()    # drop this page's parsed objects before the next one
+
+    pages = [clean_text(text) for text in pages]
+    full_text = _join_pages(pages)
 
     return ExtractionResult(
         text               = full_text,
         pages              = pages,
-        extraction_method  = "pdfplumber",
+        extraction_method  = "pdfium",
         warnings           = warnings,
     )
 
@@ -118,14 +147,13 @@ def _extract_scanned_pdf(file_path: str) -> ExtractionResult:
     # DPI 300 is the sweet spot: good OCR quality without huge memory use
     images = convert_from_path(file_path, dpi=300, poppler_path=poppler_path)
 
-    for i, image in enumerate(images):
-        text = pytesseract.image_to_string(image, lang="eng", config="--psm 3")
+    for i, text in enumerate(_ocr_pages(images)):
         pages.append(clean_text(text))
 
         if len(pages[-1].strip()) < 50:
             warnings.append(f"Page {i+1}: OCR returned minimal text — scan quality may be poor")
 
-    full_text = "\n\n--- PAGE BREAK ---\n\n".join(p for p in pages if p.strip())
+    full_text = _join_pages(pages)
 
     return ExtractionResult(
         text              = full_text,
@@ -144,7 +172,7 @@ def _extract_mixed_pdf(file_path: str) -> ExtractionResult:
     """
     try:
         import pdfplumber
-        from pdf2image import convert_from_path
+        import pdf2image  # noqa: F401
         import pytesseract
     except ImportError:
         raise ImportError("Run: pip install pdfplumber pdf2image pytesseract")
@@ -160,33 +188,43 @@ def _extract_mixed_pdf(file_path: str) -> ExtractionResult:
     warnings = []
     methods  = []
 
-    # Pre-render all pages as images (needed for OCR fallback)
-    images = convert_from_path(file_path, dpi=300, poppler_path=poppler_path)
+    ocr_pages = []   # indexes of scanned pages, rendered and OCR'd after the text pass
 
     with pdfplumber.open(file_path) as pdf:
         for i, page in enumerate(pdf.pages):
             text = page.extract_text() or ""
             clean = clean_text(text)
 
-            if len(clean.replace(" ", "")) > 30:
+            # More than 30 non-space characters (counted without copying the page)
+            if len(clean) - clean.count(" ") > 30:
                 # Digital page — pdfplumber worked
                 pages.append(clean)
                 methods.append("pdfplumber")
             else:
-                # Scanned page — use OCR on the pre-rendered image
-                if i < len(images):
-                    ocr_text = pytesseract.image_to_string(images[i], lang="eng", config="--psm 3")
-                    pages.append(clean_text(ocr_text))
-                    methods.append("ocr")
-                else:
-                    pages.append("")
-                    warnings.append(f"Page {i+1}: could not render for OCR")
+                # Scanned page — OCR it once the text pass is done
+                pages.append("")
+                ocr_pages.append(i)
+
+            page.close()    # drop this page's parsed objects before the next one
+
+    # Render only the pages that need OCR (digital pages are never rasterised)
+    images = _render_pages(file_path, ocr_pages, poppler_path)
+
+    rendered = [i for i in ocr_pages if i in images]
+    for i in ocr_pages:
+        if i in images:
+            methods.append("ocr")
+        else:
+            warnings.append(f"Page {i+1}: could not render for OCR")
+
+    for i, ocr_text in zip(rendered, _ocr_pages([images[i] for i in rendered])):
+        pages[i] = clean_text(ocr_text)
 
     ocr_count = methods.count("ocr")
     if ocr_count:
         warnings.append(f"{ocr_count} pages required OCR")
 
-    full_text = "\n\n--- PAGE BREAK ---\n\n".join(p for p in pages if p.strip())
+    full_text = _join_pages(pages)
 
     return ExtractionResult(
         text              = full_text,
@@ -206,38 +244,28 @@ def _extract_word(file_path: str) -> ExtractionResult:
     """
     try:
         from docx import Document
+        from docx.oxml.ns import qn
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
     except ImportError:
         raise ImportError("Run: pip install python-docx")
 
     doc      = Document(file_path)
     sections = []
 
-    for para in doc.paragraphs:
-        text = para.text.strip()
-        if not text:
-            continue
-
-        style = para.style.name.lower()
-
-        if "heading 1" in style:
-            sections.append(f"\n[H1] {text}\n")
-        elif "heading 2" in style:
-            sections.append(f"\n[H2] {text}\n")
-        elif "heading 3" in style:
-            sections.append(f"\n[H3] {text}\n")
+    # One pass over the body in reading order, so tables stay next to the
+    # headings and paragraphs around them
+    para_tag, table_tag = qn("w:p"), qn("w:tbl")
+    for child in doc.element.body.iterchildren():
+        if child.tag == para_tag:
+            text = _word_paragraph_text(Paragraph(child, doc))
+        elif child.tag == table_tag:
+            text = _word_table_text(Table(child, doc))
         else:
+            continue
+        if text:
             sections.append(text)
 
-    # Also extract tables
-    for table in doc.tables:
-        rows = []
-        for row in table.rows:
-            cell_texts = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-            if cell_texts:
-                rows.append(" | ".join(cell_texts))
-        if rows:
-            sections.append("\n[TABLE]\n" + "\n".join(rows) + "\n[/TABLE]\n")
-
     full_text = "\n".join(sections)
 
     return ExtractionResult(
@@ -247,11 +275,46 @@ def _extract_word(file_path: str) -> ExtractionResult:
     )
 
 
+def _word_paragraph_text(para) -> str:
+    text = para.text.strip()
+    if not text:
+        return ""
+
+    style = para.style.name.lower()
+
+    if "heading 1" in style:
+        return f"\n[H1] {text}\n"
+    elif "heading 2" in style:
+        return f"\n[H2] {text}\n"
+    elif "heading 3" in style:
+        return f"\n[H3] {text}\n"
+    return text
+
+
+def _word_table_text(table) -> str:
+    rows = []
+    for row in table.rows:
+        cell_texts = [t for t in (cell.text.strip() for cell in row.cells) if t]
+        if cell_texts:
+            rows.append(" | ".join(cell_texts))
+    return "\n[TABLE]\n" + "\n".join(rows) + "\n[/TABLE]\n" if rows else ""
+
+
 # ── PLAIN TEXT ────────────────────────────────────────────────────────────────
 
 def _extract_text(file_path: str) -> ExtractionResult:
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        text = f.read()
+    # Decode straight from a read-only mapping of the file: no intermediate
+    # bytes copy of the whole file is held alongside the decoded text
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            text = ""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, "utf-8", "replace")
+
+    # Universal newlines, as text-mode open() would have given
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
     return ExtractionResult(
         text              = clean_text(text),
         pages             = [text],
@@ -261,6 +324,68 @@ def _extract_text(file_path: str) -> ExtractionResult:
 
 # ── UTILITIES ─────────────────────────────────────────────────────────────────
 
+def _render_pages(file_path: str, page_indexes: list[int], poppler_path: Optional[str]) -> dict:
+    """
+    Render the given 0-based pages at 300 DPI; returns {page_index: image}.
+    Consecutive pages share one pdftoppm call (first_page/last_page are 1-based).
+    Pages that fail to render are left out.
+    """
+    from pdf2image import convert_from_path
+
+    images = {}
+    runs   = []
+    for i in page_indexes:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+
+    for first, last in runs:
+        try:
+            rendered = convert_from_path(
+                file_path, dpi=300, first_page=first + 1, last_page=last + 1,
+                poppler_path=poppler_path,
+            )
+        except Exception:
+            continue
+        images.update(zip(range(first, last + 1), rendered))
+    return images
+
+
+def _ocr_page(image) -> str:
+    import pytesseract
+    return pytesseract.image_to_string(image, lang="eng", config="--psm 3")
+
+
+def _ocr_pages(images: list) -> list[str]:
+    """OCR page images concurrently (OCR_WORKERS at a time); results keep page order."""
+    if len(images) <= 1:
+        return [_ocr_page(image) for image in images]
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")   # inherited by the tesseract subprocesses
+    with ThreadPoolExecutor(max_workers=min(OCR_WORKERS, len(images))) as pool:
+        return list(pool.map(_ocr_page, images))
+
+
+PAGE_BREAK = "\n\n--- PAGE BREAK ---\n\n"
+
+
+def _join_pages(pages: list[str]) -> str:
+    """
+    Join non-empty pages with PAGE_BREAK. Every page has been through
+    clean_text (which strips), so a blank page is just "" — a truthiness test
+    replaces the per-page .strip() copy. str.join sizes the result up front
+    and copies each page once.
+    """
+    return PAGE_BREAK.join(p for p in pages if p)
+
+
+# clean_text runs once per page, so its patterns are compiled at import
+_RE_RULES        = re.compile(r"[_\-=]{5,}")
+_RE_BLANK_LINES  = re.compile(r"\n{3,}")
+_RE_SPACE_RUNS   = re.compile(r"[ \t]{3,}")
+_RE_PAGE_NUMBER  = re.compile(r"Page \d+ of \d+", re.IGNORECASE)
+
+
 def clean_text(text: str) -> str:
     """
     Normalise extracted text:
@@ -272,24 +397,27 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
 
-    # Remove null bytes
-    text = text.replace("\x00", "")
+    # Remove null bytes (the membership checks are memchr scans; most pages
+    # have neither null bytes nor "\r", so no copies are made for them)
+    if "\x00" in text:
+        text = text.replace("\x00", "")
 
     # Normalise line endings
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
 
     # Remove repeated special characters (common OCR artifacts)
-    text = re.sub(r"[_\-=]{5,}", " ", text)
+    text = _RE_RULES.sub(" ", text)
 
     # Collapse 3+ consecutive blank lines to 2
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _RE_BLANK_LINES.sub("\n\n", text)
 
     # Collapse multiple spaces (but preserve intentional indentation)
-    text = re.sub(r"[ \t]{3,}", "  ", text)
+    text = _RE_SPACE_RUNS.sub("  ", text)
 
     # Remove common Kenyan government doc header/footer noise
     # e.g. "Page 1 of 12", "CONFIDENTIAL", repeated document titles
-    text = re.sub(r"Page \d+ of \d+", "", text, flags=re.IGNORECASE)
+    text = _RE_PAGE_NUMBER.sub("", text)
 
     return text.strip()
 
@@ -298,11 +426,13 @@ def _tables_to_text(tables: list) -> str:
     """Convert pdfplumber table output to readable text."""
     output = []
     for table in tables:
-        rows = []
-        for row in table:
-            cells = [str(cell or "").strip() for cell in row]
-            if any(cells):
-                rows.append(" | ".join(cells))
+        # Strip every cell in one comprehension; rows whose cells are all
+        # empty are dropped, and each table is joined once
+        rows = [
+            " | ".join(cells)
+            for cells in ([str(cell or "").strip() for cell in row] for row in table)
+            if any(cells)
+        ]
         if rows:
             output.append("[TABLE]\n" + "\n".join(rows) + "\n[/TABLE]")
     return "\n\n".join(output)
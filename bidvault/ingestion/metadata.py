@@ -6,11 +6,11 @@ Every document chunk is stored with core fields (file_name, chunk_index, etc.)
 and a flexible 'extra' dictionary for domain-specific metadata.
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 from typing import Optional, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)    # one per stored chunk — no per-instance __dict__
 class DocumentMetadata:
     """
     Core metadata for a document chunk.
@@ -52,13 +52,17 @@ class DocumentMetadata:
         Merge core fields and 'extra' fields into a flat dictionary
         for storage in pgvector JSONB.
         """
-        d = asdict(self)
-        extra = d.pop("extra", {})
-        
+        # Read the flat fields directly — asdict() would deep-copy every value
+        # (including the whole 'extra' dict) only for it to be filtered here
+        result = {}
+        for name in _CORE_FIELDS:
+            v = getattr(self, name)
+            if v is not None and v != "":
+                result[name] = v
+
         # Merge extra fields into the top-level
         # Filter None and empty strings for cleaner indexing
-        result = {k: v for k, v in d.items() if v is not None and v != ""}
-        for k, v in extra.items():
+        for k, v in self.extra.items():
             if v is not None and v != "":
                 result[k] = v
                 
@@ -81,6 +85,10 @@ class DocumentMetadata:
         return cls(**core_data, extra=extra_data)
 
 
+# Core field names in declaration order, resolved once for to_dict()
+_CORE_FIELDS = tuple(f.name for f in fields(DocumentMetadata) if f.name != "extra")
+
+
 # ── INTERFACE ───────────────────────────────────────────────────────────────
 
 class DocumentAnalyzer:
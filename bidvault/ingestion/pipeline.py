@@ -37,7 +37,10 @@ SHAREPOINT USAGE:
     ))
 """
 
+import contextlib
+import io
 import os
+import sys
 import time
 from dataclasses import dataclass, field
 from typing import Optional
@@ -46,8 +49,8 @@ from .detector    import detect
 from .extractor   import extract
 from .chunker     import chunk
 from .metadata    import DocumentMetadata, DocumentAnalyzer
-from .embedder    import Embedder
-from .vector_store import VectorStore
+from .embedder    import Embedder, get_embedder
+from .vector_store import VectorStore, new_chunk_id
 
 # Import the default analyzer to preserve the bidding flow
 try:
@@ -69,6 +72,11 @@ class IngestionRequest:
     document_id:    str     = ""               # UUID from your PostgreSQL documents table
     source_type:    str     = "other"
 
+    # Re-index: once all new chunks are stored, delete document_id's previous
+    # ones — or, without a document_id, sharepoint_item_id's — in the same
+    # transaction as the last store; a failed ingest keeps them
+    replace_existing: bool  = False
+
     # Domain-specific fields (stored in metadata.extra)
     # Keeping these here to avoid breaking existing API calls
     sector:         str     = ""
@@ -102,6 +110,18 @@ class IngestionResult:
 
 # ── PIPELINE ─────────────────────────────────────────────────────────────────
 
+# Default cap on bulk-ingest worker processes (each holds a parsed PDF in memory)
+DEFAULT_MAX_WORKERS = 8
+
+# Chunks per embed + store call when ingesting several documents together
+EMBED_BATCH_SIZE    = 256
+
+# Chunks per embed + store round for a single document: bounds how many vectors
+# are held at once (a 3072-dim vector is ~100 KB as a float list) while leaving
+# cloud embedders enough batches to run concurrently
+STORE_WINDOW        = 2048
+
+
 class IngestionPipeline:
 
     def __init__(
@@ -113,7 +133,7 @@ class IngestionPipeline:
     ):
         # Default to BidAnalyzer to preserve the "bidding flow"
         self.analyzer     = analyzer or BidAnalyzer()
-        self.embedder     = embedder or Embedder()
+        self.embedder     = embedder or get_embedder()
         self.vector_store = vector_store or VectorStore()
         self.dry_run      = dry_run
 
@@ -126,138 +146,49 @@ class IngestionPipeline:
         try:
             return self._run(request, start_time)
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return IngestionResult(
-                success          = False,
-                error            = str(e),
-                duration_seconds = time.time() - start_time,
-            )
+            return _failed(e, start_time)
 
     def _run(self, request: IngestionRequest, start_time: float) -> IngestionResult:
-        warnings = []
-
-        # ── STEP 1: DETECT ────────────────────────────────────────────────────
-        print(f"[1/5] Detecting document type: {request.file_path}")
-        detection = detect(request.file_path)
-        print(f"      → {detection.doc_type} ({detection.page_count} pages, OCR={detection.needs_ocr})")
-
-        if detection.notes:
-            warnings.append(f"Detection: {detection.notes}")
-
-        # ── STEP 2: EXTRACT ───────────────────────────────────────────────────
-        print(f"[2/5] Extracting text...")
-        extraction = extract(request.file_path, detection)
-        print(f"      → {extraction.char_count:,} characters via {extraction.extraction_method}")
-
-        warnings.extend(extraction.warnings)
-
-        if extraction.char_count < 200:
-            warnings.append(
-                "Extracted text is very short — document may be empty, password-protected, or corrupt"
-            )
-
-        # ── STEP 3: CHUNK ─────────────────────────────────────────────────────
-        print(f"[3/5] Chunking...")
-        chunks = chunk(extraction.text, source_type=request.source_type)
-        print(f"      → {len(chunks)} chunks")
-
-        if not chunks:
-            return IngestionResult(
-                success          = False,
-                error            = "No chunks produced — text may be too short or extraction failed",
-                doc_type         = detection.doc_type,
-                page_count       = detection.page_count,
-                extraction_method= extraction.extraction_method,
-                warnings         = warnings,
-                duration_seconds = time.time() - start_time,
-            )
-
-        # ── STEP 4: BUILD METADATA ────────────────────────────────────────────
-        print(f"[4/5] Building metadata & analyzing...")
-
-        # 1. Create base metadata
-        base_metadata = DocumentMetadata(
-            document_id          = request.document_id,
-            file_name            = os.path.basename(request.file_path),
-        )
+        prepared = _prepare(request, self.analyzer, start_time)
+        return self._embed_and_store(prepared)
 
-        # 2. Package initial domain fields into 'extra'
-        initial_extra = {
-            "source_type":      request.source_type,
-            "sector":           request.sector,
-            "donor":            request.donor,
-            "year":             request.year,
-            "client":           request.client,
-            "country":          request.country,
-            "won":              request.won,
-            "tender_value_usd": request.tender_value_usd,
-            "bid_reference":    request.bid_reference,
-            "sharepoint_item_id": request.sharepoint_item_id,
-            "sharepoint_url":    request.sharepoint_url,
-        }
-        initial_extra.update(request.extra)
-        base_metadata.extra = initial_extra
-
-        # 3. Call domain analyzer for enrichment (auto-tagging etc)
-        # We pass the first 5000 chars for analysis
-        enriched_extra = self.analyzer.analyze(extraction.text[:5000], base_metadata.extra)
-        base_metadata.extra.update(enriched_extra)
-        
-        print(f"      → Analysis complete (extra fields: {list(base_metadata.extra.keys())})")
+    def _embed_and_store(self, prepared: "_PreparedDocument") -> IngestionResult:
+        """Step 5 for a document that has been through steps 1-4."""
+        if prepared.error:
+            return prepared.result(success=False)
 
         # ── STEP 5: EMBED + STORE ─────────────────────────────────────────────
-        print(f"[5/5] Embedding {len(chunks)} chunks...")
+        print(f"[5/5] Embedding {len(prepared.texts)} chunks...")
 
         if self.dry_run:
             print("      → DRY RUN: skipping embed and store")
-            return IngestionResult(
-                success           = True,
-                chunks_stored     = len(chunks),
-                doc_type          = detection.doc_type,
-                page_count        = detection.page_count,
-                extraction_method = extraction.extraction_method,
-                warnings          = warnings,
-                duration_seconds  = time.time() - start_time,
-            )
-
-        # Prepare per-chunk metadata
-        chunk_texts     = [c.text for c in chunks]
-        chunk_metadatas = []
-
-        for c in chunks:
-            # Shallow copy base metadata for this chunk
-            meta = DocumentMetadata(
-                document_id  = base_metadata.document_id,
-                file_name    = base_metadata.file_name,
-                extra        = base_metadata.extra.copy()
-            )
-            meta.chunk_index    = c.index
-            meta.chunk_method   = c.chunk_method
-            meta.section_hint   = c.section_hint
-            # Use analyzer to infer section type from hint
-            meta.section_type   = self.analyzer.infer_section_type(c.section_hint)
-            chunk_metadatas.append(meta)
-
-        # Embed all chunks in one batched call
-        embeddings = self.embedder.embed_batch(chunk_texts)
-        print(f"      → {len(embeddings)} embeddings generated")
-
-        # Store to pgvector
-        items  = list(zip(chunk_texts, embeddings, chunk_metadatas))
-        stored = self.vector_store.store_chunks_batch(items)
-        print(f"      → {stored} chunks stored in vector DB")
-
-        duration = time.time() - start_time
-        return IngestionResult(
-            success           = True,
-            chunks_stored     = stored,
-            doc_type          = detection.doc_type,
-            page_count        = detection.page_count,
-            extraction_method = extraction.extraction_method,
-            warnings          = warnings,
-            duration_seconds  = duration,
-        )
+            return prepared.result(success=True, chunks_stored=len(prepared.texts))
+
+        # Embed and store window by window, so only one window's vectors are
+        # alive at a time instead of the whole document's. On a re-index the
+        # old chunks are deleted in the last window's transaction; if a window
+        # fails, the windows already stored are deleted again, so the document
+        # is either fully replaced or left as it was.
+        store  = self.vector_store
+        stored = []
+        try:
+            for start in range(0, len(prepared.texts), STORE_WINDOW):
+                texts      = prepared.texts[start : start + STORE_WINDOW]
+                embeddings = self.embedder.embed_batch(texts)
+                ids        = [new_chunk_id() for _ in texts]
+                with store.transaction():
+                    store.store_chunks_batch(
+                        list(zip(texts, embeddings, prepared.metadatas[start : start + STORE_WINDOW])), ids=ids
+                    )
+                    if prepared.replacing and start + STORE_WINDOW >= len(prepared.texts):
+                        _delete_replaced(store, [prepared], keep_ids=stored + ids)
+                stored += ids
+        except Exception:
+            _discard_chunks(store, stored)
+            raise
+        print(f"      → {len(stored)} chunks embedded and stored in vector DB")
+
+        return prepared.result(success=True, chunks_stored=len(stored))
 
     # ── BULK INGEST ───────────────────────────────────────────────────────────
 
@@ -266,6 +197,7 @@ class IngestionPipeline:
         folder_path:    str,
         default_meta:   dict,
         extensions:     list[str] = [".pdf", ".docx", ".txt"],
+        max_workers:    Optional[int] = None,
     ) -> list[IngestionResult]:
         """
         Ingest all documents in a folder.
@@ -274,27 +206,17 @@ class IngestionPipeline:
         default_meta: dict with source_type, sector, etc. to apply to all files.
         Per-file metadata (year, client, won) should be set by the caller
         via a metadata CSV or SharePoint columns.
-        """
-        import glob
-
-        results = []
-        files   = []
 
-        for ext in extensions:
-            files.extend(glob.glob(os.path.join(folder_path, f"**/*{ext}"), recursive=True))
+        max_workers: processes that detect / extract / chunk files in parallel
+        (default min(8, cpu_count)); embedding and storing stay in this process,
+        overlapping with the workers. 1 runs everything sequentially.
+        """
+        files = _find_files(folder_path, extensions)
 
         print(f"Found {len(files)} files in {folder_path}")
 
-        for i, file_path in enumerate(files, 1):
-            print(f"\n[{i}/{len(files)}] {os.path.basename(file_path)}")
-            request = IngestionRequest(file_path=file_path, **default_meta)
-            result  = self.ingest(request)
-            results.append(result)
-
-            if not result.success:
-                print(f"  ✗ Failed: {result.error}")
-            else:
-                print(f"  ✓ {result.chunks_stored} chunks")
+        requests = [IngestionRequest(file_path=file_path, **default_meta) for file_path in files]
+        results  = self.ingest_many(requests, max_workers=max_workers)
 
         success_count = sum(1 for r in results if r.success)
         total_chunks  = sum(r.chunks_stored for r in results)
@@ -303,6 +225,419 @@ class IngestionPipeline:
 
         return results
 
+    def ingest_many(
+        self,
+        requests:         list[IngestionRequest],
+        max_workers:      Optional[int] = None,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+    ) -> list[IngestionResult]:
+        """
+        Ingest several documents. Steps 1-4 run in a process pool (PDF parsing /
+        OCR / chunking are CPU-bound); their chunks are pooled across documents
+        and embedded + stored embed_batch_size at a time, so small documents
+        don't each pay for an underfilled embedding call.
+
+        max_workers: default min(8, cpu_count); 1 prepares documents in this process.
+        Results keep the order of `requests`.
+        """
+        max_workers = max_workers or min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+        results     = [None] * len(requests)
+        buffer      = _ChunkBuffer(self, requests, results, embed_batch_size)
+
+        for done, (i, prepared) in enumerate(self._prepare_all(requests, max_workers), 1):
+            print(f"\n[{done}/{len(requests)}] {os.path.basename(requests[i].file_path)}")
+            if prepared.log:
+                sys.stdout.write(prepared.log)
+            buffer.add(i, prepared)
+        buffer.flush()
+
+        if not self.dry_run and any(r.success and r.chunks_stored for r in results):
+            self.refresh_stats()
+        return results
+
+    def refresh_stats(self) -> None:
+        """
+        Bring the vector store's chunk_stats up to date after new chunks are
+        stored. ingest_many does this itself; callers of ingest() do it once
+        their batch of documents is in. A failure only leaves stats stale.
+        """
+        try:
+            self.vector_store.refresh_stats()
+        except Exception as e:
+            print(f"Stats refresh failed: {e}")
+
+    def _prepare_all(self, requests: list[IngestionRequest], max_workers: int):
+        """Yield (index, _PreparedDocument) as each document finishes steps 1-4."""
+        if max_workers == 1 or len(requests) <= 1:
+            for i, request in enumerate(requests):
+                # Let the kernel read the next file in while this one is parsed
+                if i + 1 < len(requests):
+                    _prefetch(requests[i + 1].file_path)
+                yield i, _prepare_safely(request, self.analyzer)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        workers = min(max_workers, len(requests))
+        with ProcessPoolExecutor(
+            max_workers = workers,
+            initializer = _init_worker,
+            initargs    = (self.analyzer, max(1, (os.cpu_count() or 4) // workers)),
+        ) as pool:
+            futures = {pool.submit(_prepare_in_worker, request): i for i, request in enumerate(requests)}
+            for future in as_completed(futures):
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    # A worker died (pdfium segfault, OOM kill): the pool is broken
+                    # and the remaining documents fail, but the finished ones still count
+                    prepared = _PreparedDocument(start_time=time.time(), error=f"Worker process failed: {e!r}")
+                yield futures[future], prepared
+
+
+class _ChunkBuffer:
+    """
+    Collects chunks from several prepared documents and embeds + stores them
+    in batches. A document's result is filled in once all its chunks are stored.
+
+    A document spread over several batches is still all-or-nothing: if one of
+    its batches fails, its pending chunks are dropped and those already stored
+    are deleted again. A re-indexed document's previous chunks are deleted in
+    the transaction that stores its last batch, so until then (and after a
+    failure) the old version stays searchable.
+    """
+
+    def __init__(self, pipeline: IngestionPipeline, requests: list, results: list, batch_size: int):
+        self.pipeline   = pipeline
+        self.names      = [os.path.basename(r.file_path) for r in requests]
+        self.results    = results
+        self.batch_size = batch_size
+        self.items      = []    # (document index, text, metadata)
+        self.remaining  = {}    # document index → chunks not yet stored
+        self.prepared   = {}    # document index → _PreparedDocument
+        self.stored     = {}    # document index → ids of its chunks stored so far
+
+    def add(self, index: int, prepared: "_PreparedDocument") -> None:
+        if prepared.error:
+            self._finish(index, prepared.result(success=False))
+            return
+        if self.pipeline.dry_run:
+            print("      → DRY RUN: skipping embed and store")
+            self._finish(index, prepared.result(success=True, chunks_stored=len(prepared.texts)))
+            return
+
+        self.prepared[index]  = prepared
+        self.remaining[index] = len(prepared.texts)
+        self.stored[index]    = []
+        self.items.extend((index, text, meta) for text, meta in zip(prepared.texts, prepared.metadatas))
+        while len(self.items) >= self.batch_size:
+            batch, self.items = self.items[:self.batch_size], self.items[self.batch_size:]
+            self._flush(batch)
+
+    def flush(self) -> None:
+        if self.items:
+            batch, self.items = self.items, []
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        # Similar lengths together → less padding inside each model batch
+        batch.sort(key=lambda item: len(item[1]))
+        ids    = [new_chunk_id() for _ in batch]
+        counts = {}
+        for i, _, _ in batch:
+            counts[i] = counts.get(i, 0) + 1
+        print(f"\nEmbedding {len(batch)} chunks from {len(counts)} document(s)...")
+
+        # Documents whose last chunks are in this batch: a re-index drops their
+        # previous chunks (all but the new ones) in the same transaction
+        completing = [i for i, n in counts.items() if self.remaining[i] == n]
+        replacing  = [self.prepared[i] for i in completing if self.prepared[i].replacing]
+        keep_ids   = [chunk_id for i in completing if self.prepared[i].replacing for chunk_id in self.stored[i]]
+        keep_ids  += [chunk_id for (i, _, _), chunk_id in zip(batch, ids) if self.prepared[i].replacing]
+
+        store = self.pipeline.vector_store
+        try:
+            embeddings = self.pipeline.embedder.embed_batch([text for _, text, _ in batch])
+            with store.transaction():
+                store.store_chunks_batch([
+                    (text, embedding, meta) for (_, text, meta), embedding in zip(batch, embeddings)
+                ], ids=ids)
+                _delete_replaced(store, replacing, keep_ids=keep_ids)
+        except Exception as e:
+            for i in counts:
+                self._fail(i, e)
+            return
+
+        for (i, _, _), chunk_id in zip(batch, ids):
+            self.stored[i].append(chunk_id)
+        for i, n in counts.items():
+            self.remaining[i] -= n
+            if self.remaining[i] == 0:
+                prepared = self.prepared[i]
+                self._finish(i, prepared.result(success=True, chunks_stored=len(prepared.texts)))
+
+    def _fail(self, index: int, error: Exception) -> None:
+        """Fail a document: drop its pending chunks and delete those already stored."""
+        self.items = [item for item in self.items if item[0] != index]
+        _discard_chunks(self.pipeline.vector_store, self.stored.get(index, []))
+        self._finish(index, _failed(error, self.prepared[index].start_time))
+
+    def _finish(self, index: int, result: IngestionResult) -> None:
+        self.remaining.pop(index, None)
+        self.prepared.pop(index, None)
+        self.stored.pop(index, None)
+        self.results[index] = result
+        _print_outcome(result, self.names[index])
+
+
+def _delete_replaced(store: VectorStore, documents: list, keep_ids: list) -> None:
+    """Delete the previous chunks of re-indexed documents, all but keep_ids."""
+    store.delete_by_documents([d.replaces for d in documents if d.replaces], keep_ids=keep_ids)
+    store.delete_by_sharepoint_items([d.replaces_item for d in documents if d.replaces_item], keep_ids=keep_ids)
+
+
+def _discard_chunks(store: VectorStore, chunk_ids: list) -> None:
+    """Delete the chunks a failed document managed to store before failing."""
+    if not chunk_ids:
+        return
+    try:
+        store.delete_chunks(chunk_ids)
+    except Exception as e:
+        print(f"      ✗ Could not remove {len(chunk_ids)} partially stored chunks: {e}")
+
+
+# ── STEPS 1-4 ─────────────────────────────────────────────────────────────────
+
+@dataclass
+class _PreparedDocument:
+    """A document after detect → extract → chunk → metadata; picklable, so it can
+    come back from a worker process."""
+    start_time:         float
+    doc_type:           str                     = ""
+    page_count:         int                     = 0
+    extraction_method:  str                     = ""
+    warnings:           list[str]               = field(default_factory=list)
+    texts:              list[str]               = field(default_factory=list)
+    metadatas:          list[DocumentMetadata]  = field(default_factory=list)
+    error:              str                     = ""
+    log:                str                     = ""    # step output captured in a pool worker
+    replaces:           str                     = ""    # document_id whose old chunks are deleted on store
+    replaces_item:      str                     = ""    # or the sharepoint_item_id, without a document_id
+
+    @property
+    def replacing(self) -> bool:
+        return bool(self.replaces or self.replaces_item)
+
+    def result(self, success: bool, chunks_stored: int = 0) -> IngestionResult:
+        return IngestionResult(
+            success           = success,
+            chunks_stored     = chunks_stored,
+            error             = self.error,
+            doc_type          = self.doc_type,
+            page_count        = self.page_count,
+            extraction_method = self.extraction_method,
+            warnings          = self.warnings,
+            duration_seconds  = time.time() - self.start_time,
+        )
+
+
+def _prepare(request: IngestionRequest, analyzer: DocumentAnalyzer, start_time: float) -> _PreparedDocument:
+    warnings = []
+
+    # ── STEP 1: DETECT ────────────────────────────────────────────────────────
+    print(f"[1/5] Detecting document type: {request.file_path}")
+    detection = detect(request.file_path)
+    print(f"      → {detection.doc_type} ({detection.page_count} pages, OCR={detection.needs_ocr})")
+
+    if detection.notes:
+        warnings.append(f"Detection: {detection.notes}")
+
+    # ── STEP 2: EXTRACT ───────────────────────────────────────────────────────
+    print(f"[2/5] Extracting text...")
+    extraction = extract(request.file_path, detection)
+    print(f"      → {extraction.char_count:,} characters via {extraction.extraction_method}")
+
+    warnings.extend(extraction.warnings)
+
+    if extraction.char_count < 200:
+        warnings.append(
+            "Extracted text is very short — document may be empty, password-protected, or corrupt"
+        )
+
+    prepared = _PreparedDocument(
+        start_time        = start_time,
+        doc_type          = detection.doc_type,
+        page_count        = detection.page_count,
+        extraction_method = extraction.extraction_method,
+        warnings          = warnings,
+        replaces          = request.document_id if request.replace_existing else "",
+        replaces_item     = request.sharepoint_item_id if request.replace_existing and not request.document_id else "",
+    )
+
+    # The analyzer only reads the opening 5000 chars; keep those and drop the
+    # full text once it is chunked, rather than holding it until step 5
+    text          = extraction.text
+    analysis_text = text[:5000]
+    del extraction
+
+    # ── STEP 3: CHUNK ─────────────────────────────────────────────────────────
+    print(f"[3/5] Chunking...")
+    chunks = chunk(text, source_type=request.source_type)
+    del text
+    print(f"      → {len(chunks)} chunks")
+
+    if not chunks:
+        prepared.error = "No chunks produced — text may be too short or extraction failed"
+        return prepared
+
+    # ── STEP 4: BUILD METADATA ────────────────────────────────────────────────
+    print(f"[4/5] Building metadata & analyzing...")
+
+    # 1. Create base metadata
+    base_metadata = DocumentMetadata(
+        document_id          = request.document_id,
+        file_name            = os.path.basename(request.file_path),
+    )
+
+    # 2. Package initial domain fields into 'extra'
+    initial_extra = {
+        "source_type":      request.source_type,
+        "sector":           request.sector,
+        "donor":            request.donor,
+        "year":             request.year,
+        "client":           request.client,
+        "country":          request.country,
+        "won":              request.won,
+        "tender_value_usd": request.tender_value_usd,
+        "bid_reference":    request.bid_reference,
+        "sharepoint_item_id": request.sharepoint_item_id,
+        "sharepoint_url":    request.sharepoint_url,
+    }
+    initial_extra.update(request.extra)
+    base_metadata.extra = initial_extra
+
+    # 3. Call domain analyzer for enrichment (auto-tagging etc)
+    # We pass the first 5000 chars for analysis
+    enriched_extra = analyzer.analyze(analysis_text, base_metadata.extra)
+    base_metadata.extra.update(enriched_extra)
+
+    print(f"      → Analysis complete (extra fields: {list(base_metadata.extra.keys())})")
+
+    # Prepare per-chunk metadata
+    chunk_texts     = [c.text for c in chunks]
+    chunk_metadatas = []
+
+    # Chunks of one section share its hint, so infer each distinct hint's type once
+    section_types = {hint: analyzer.infer_section_type(hint) for hint in {c.section_hint for c in chunks}}
+
+    # Build each chunk's metadata directly from the base fields read once here;
+    # dataclasses.replace() would re-read every field per chunk
+    document_id = base_metadata.document_id
+    file_name   = base_metadata.file_name
+    base_extra  = base_metadata.extra
+    for c in chunks:
+        chunk_metadatas.append(DocumentMetadata(
+            document_id  = document_id,
+            file_name    = file_name,
+            chunk_index  = c.index,
+            chunk_method = c.chunk_method,
+            section_hint = c.section_hint,
+            section_type = section_types[c.section_hint],
+            extra        = base_extra.copy(),
+        ))
+
+    prepared.texts     = chunk_texts
+    prepared.metadatas = chunk_metadatas
+    return prepared
+
+
+# ── PROCESS POOL ──────────────────────────────────────────────────────────────
+
+_worker_analyzer: Optional[DocumentAnalyzer] = None
+
+
+def _init_worker(analyzer: DocumentAnalyzer, ocr_workers: int) -> None:
+    from . import extractor
+
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+    # Every worker OCRs with its own thread pool; split the cores between them
+    # and keep tesseract to one OpenMP thread per page
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    extractor.OCR_WORKERS = min(extractor.OCR_WORKERS, ocr_workers)
+
+
+def _prepare_in_worker(request: IngestionRequest) -> _PreparedDocument:
+    # Step output is buffered and handed back with the result, so workers never
+    # contend for (or block on) stdout, and each document's lines print together
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        prepared = _prepare_safely(request, _worker_analyzer)
+    prepared.log = output.getvalue()
+    return prepared
+
+
+def _prepare_safely(request: IngestionRequest, analyzer: DocumentAnalyzer) -> _PreparedDocument:
+    """Steps 1-4; failures come back as an error, not an exception."""
+    start_time = time.time()
+    try:
+        return _prepare(request, analyzer, start_time)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return _PreparedDocument(start_time=start_time, error=str(e))
+
+
+def _failed(e: Exception, start_time: float) -> IngestionResult:
+    import traceback
+    traceback.print_exc()
+    return IngestionResult(
+        success          = False,
+        error            = str(e),
+        duration_seconds = time.time() - start_time,
+    )
+
+
+def _print_outcome(result: IngestionResult, name: str) -> None:
+    if not result.success:
+        print(f"  ✗ {name}: Failed: {result.error}")
+    else:
+        print(f"  ✓ {name}: {result.chunks_stored} chunks")
+
+
+def _prefetch(file_path: str) -> None:
+    """
+    Start asynchronous readahead of the whole file into the page cache
+    (posix_fadvise WILLNEED). Returns immediately; a no-op where unsupported.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _find_files(folder_path: str, extensions: list[str]) -> list[str]:
+    """
+    Files under folder_path ending in any of `extensions`, from one walk of the
+    tree (one glob("**/*ext") per extension walked it once each). Like glob,
+    hidden files and directories are left out.
+    """
+    suffixes = tuple(extensions)
+    files    = []
+    for root, dirs, names in os.walk(folder_path):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        files.extend(
+            os.path.join(root, name) for name in names
+            if name.endswith(suffixes) and not name.startswith(".")
+        )
+    return files
+
 
 def _current_year() -> int:
     from datetime import datetime
@@ -34,22 +34,51 @@ ENVIRONMENT VARIABLES:
   SHAREPOINT_CLIENT_SECRET
   SHAREPOINT_SITE_URL
   SHAREPOINT_LIBRARY_NAME     — Document library name, default "Documents"
+  SHAREPOINT_DOWNLOAD_CONCURRENCY — files downloaded at once during a sync, default 16
+  SHAREPOINT_SYNC_STATE_PATH  — SQLite file recording ingested item versions and
+                                the delta link syncs resume from
+                                (default .bidvault_cache/sharepoint_sync.sqlite3)
 """
 
+import hashlib
 import os
-import json
+import random
+import sqlite3
 import tempfile
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from .pipeline import IngestionPipeline, IngestionRequest, IngestionResult
 
 
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 TOKEN_URL  = "https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
 
+# Library items the pipeline can ingest (matched with str.endswith)
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".doc", ".txt")
+
+# Files downloaded in parallel during a sync (downloads are network-bound)
+DOWNLOAD_CONCURRENCY = int(os.environ.get("SHAREPOINT_DOWNLOAD_CONCURRENCY", "16"))
+DOWNLOAD_CHUNK_SIZE  = 1 << 20     # 1 MB per read/write
+HTTP_TIMEOUT         = 60.0        # seconds per Graph request / download read
+
+# Throttled (429) or transiently failing Graph requests and downloads are
+# retried: attempts in total, and the exponential backoff range in seconds
+# used when the response carries no Retry-After
+GRAPH_MAX_ATTEMPTS = 5
+RETRY_BACKOFF_MIN  = 1.0
+RETRY_BACKOFF_MAX  = 30.0
+
+# Which items (and which versions of them) have been ingested already
+SYNC_STATE_PATH = os.environ.get(
+    "SHAREPOINT_SYNC_STATE_PATH", os.path.join(".bidvault_cache", "sharepoint_sync.sqlite3")
+)
+
 
 # ── AUTH ──────────────────────────────────────────────────────────────────────
 
@@ -62,12 +91,22 @@ class GraphAuth:
         self.client_secret = os.environ["SHAREPOINT_CLIENT_SECRET"]
         self._token        = None
         self._token_expiry = 0
+        # Sync downloads and Graph calls run on several threads; only one of
+        # them should fetch a new token when it expires
+        self._lock         = threading.Lock()
 
     def get_token(self) -> str:
         """Returns a valid access token, refreshing if expired."""
         if self._token and time.time() < self._token_expiry - 60:
             return self._token
 
+        with self._lock:
+            # Another thread may have refreshed it while we waited
+            if self._token and time.time() < self._token_expiry - 60:
+                return self._token
+            return self._fetch_token()
+
+    def _fetch_token(self) -> str:
         import urllib.request
         import urllib.parse
 
@@ -82,7 +121,7 @@ class GraphAuth:
         req = urllib.request.Request(url, data=data, method="POST")
 
         with urllib.request.urlopen(req) as resp:
-            result = json.loads(resp.read())
+            result = orjson.loads(resp.read())
 
         self._token        = result["access_token"]
         self._token_expiry = time.time() + result["expires_in"]
@@ -122,20 +161,46 @@ class SharePointConnector:
     """
     Reads documents from a SharePoint document library.
     Downloads files and passes them to the ingestion pipeline.
+    Pass the application's IngestionPipeline so the sync shares its embedder
+    and database connection; without one a fresh pipeline is built.
     """
 
-    def __init__(self, pipeline: Optional[IngestionPipeline] = None):
+    def __init__(
+        self,
+        pipeline:   Optional[IngestionPipeline] = None,
+        state_path: str = SYNC_STATE_PATH,
+    ):
         self.auth     = GraphAuth()
         self.pipeline = pipeline or IngestionPipeline()
+        self.state    = SyncState(state_path)
         self._site_id = None
         self._list_id = None
+        self._http    = None
+
+    def _get_http(self):
+        """
+        One httpx client for every Graph call and download, so paginated listing
+        and back-to-back downloads reuse open (HTTP/2 when h2 is installed)
+        connections instead of a TCP + TLS handshake per request.
+        httpx.Client is safe to share between the sync's download threads.
+        """
+        if self._http is None:
+            try:
+                import httpx
+            except ImportError:
+                raise ImportError("Run: pip install httpx")
+            from bidvault._groq import _httpx_options
+            self._http = httpx.Client(follow_redirects=True, timeout=HTTP_TIMEOUT, **_httpx_options())
+        return self._http
 
     def _get(self, url: str) -> dict:
-        """Make a GET request to Graph API."""
-        import urllib.request
-        req = urllib.request.Request(url, headers=self.auth.headers())
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read())
+        """Make a GET request to Graph API (retried when throttled)."""
+        def fetch():
+            resp = self._get_http().get(url, headers=self.auth.headers())
+            resp.raise_for_status()
+            # orjson parses the (large, paginated) item listings well ahead of json
+            return orjson.loads(resp.content)
+        return _with_retry(fetch)
 
     def _get_site_id(self) -> str:
         if self._site_id:
@@ -194,141 +259,362 @@ class SharePointConnector:
         while next_url:
             result   = self._get(next_url)
             next_url = result.get("@odata.nextLink")
-
-            for item in result.get("value", []):
-                fields     = item.get("fields", {})
-                drive_item = item.get("driveItem", {})
-
-                # Skip folders
-                if drive_item.get("folder"):
-                    continue
-
-                # Only process supported file types
-                name = fields.get("FileLeafRef", drive_item.get("name", ""))
-                if not name:
-                    continue
-                ext = Path(name).suffix.lower()
-                if ext not in (".pdf", ".docx", ".doc", ".txt"):
-                    continue
-
-                items.append(SharePointItem(
-                    item_id      = item["id"],
-                    name         = name,
-                    web_url      = drive_item.get("webUrl", ""),
-                    download_url = drive_item.get("@microsoft.graph.downloadUrl", ""),
-                    size_bytes   = drive_item.get("size", 0),
-                    modified_at  = drive_item.get("lastModifiedDateTime", ""),
-
-                    # Custom columns — map from your SharePoint column names
-                    category     = fields.get("Document_Category", ""),
-                    expiry_date  = fields.get("Expiry_Date", ""),
-                    sector       = fields.get("BidVault_Sector", ""),
-                    donor        = fields.get("BidVault_Donor", ""),
-                    source_type  = _map_source_type(fields.get("Document_Category", "")),
-                    client_name  = fields.get("Client_Name", ""),
-                    won          = _parse_won(fields.get("Bid_Won")),
-                    document_year= _parse_year(fields.get("Document_Year")),
-                ))
+            items.extend(filter(None, map(_parse_list_item, result.get("value", []))))
 
         return items
 
+    def list_changes(self, full: bool = False) -> tuple[list[SharePointItem], str]:
+        """
+        Documents added or modified since the last completed sync, via Graph's
+        delta query, plus the deltaLink to resume from next time.
+        The first sync (or full=True, or an expired link) enumerates the whole
+        library; later ones only fetch what changed. Deleted items are ignored.
+        """
+        import httpx
+
+        site_id = self._get_site_id()
+        list_id = self._get_list_id()
+        start   = (
+            f"{GRAPH_BASE}/sites/{site_id}/lists/{list_id}/items/delta"
+            f"?$expand=fields,driveItem"
+            f"&$select=id,fields,driveItem"
+        )
+        next_url = (None if full else self.state.delta_link(list_id)) or start
+
+        items = []
+        while True:
+            try:
+                result = self._get(next_url)
+            except httpx.HTTPStatusError as e:
+                # 410 Gone: the stored link expired — start over with a full listing
+                if e.response.status_code != 410 or next_url == start:
+                    raise
+                print("- Delta link expired, listing the whole library")
+                items, next_url = [], start
+                continue
+
+            items.extend(filter(None, map(_parse_list_item, result.get("value", []))))
+            if "@odata.nextLink" in result:
+                next_url = result["@odata.nextLink"]
+            else:
+                return items, result.get("@odata.deltaLink", "")
+
     def download_file(self, item: SharePointItem) -> str:
         """
         Download a SharePoint file to a temp directory.
         Returns the local file path.
         Caller is responsible for deleting the temp file.
         """
+        return self._download(item)[0]
+
+    def _download(self, item: SharePointItem) -> tuple[str, str]:
+        """download_file, also returning the SHA-1 of the content (hashed while streaming)."""
         if not item.download_url:
             raise ValueError(f"No download URL for {item.name}")
 
-        import urllib.request
-
-        suffix   = Path(item.name).suffix
-        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-
-        # The download URL is pre-authenticated — no auth header needed
-        urllib.request.urlretrieve(item.download_url, tmp_file.name)
-        return tmp_file.name
+        suffix = Path(item.name).suffix
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+
+        # The download URL is pre-authenticated — no auth header needed.
+        # Streamed to disk DOWNLOAD_CHUNK_SIZE at a time, so a large PDF is never
+        # held in memory; a failed download doesn't leave its temp file behind.
+        try:
+            with os.fdopen(fd, "wb") as out:
+                def fetch():
+                    out.seek(0)
+                    out.truncate()     # a retry starts the file over
+                    digest = hashlib.sha1()
+                    with self._get_http().stream("GET", item.download_url) as resp:
+                        resp.raise_for_status()
+                        for chunk in resp.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                            out.write(chunk)
+                            digest.update(chunk)
+                    return digest.hexdigest()
+                sha1 = _with_retry(fetch)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, sha1
 
     def sync_to_vector_store(
         self,
-        force_reindex: bool = False,
+        force_reindex:        bool = False,
+        download_concurrency: int  = DOWNLOAD_CONCURRENCY,
     ) -> dict:
         """
         Sync all documents from SharePoint into the vector store.
 
         force_reindex: if True, re-index even documents already indexed.
                        Use when you've changed chunking or embedding strategy.
+                       Only items changed since the last fully successful
+                       sync are listed (Graph delta query), and of those,
+                       items whose modified time and size match the
+                       last ingest are skipped before download, and downloads
+                       whose SHA-1 matches are skipped before ingest.
+        download_concurrency: files downloaded at once. Downloads run in a
+                       thread pool while finished files are ingested here, so
+                       network time overlaps with extraction / embedding.
 
         Returns a summary dict.
         """
         print("Starting SharePoint → Vector Store sync...")
-        items    = self.list_documents()
-        print(f"Found {len(items)} documents in SharePoint")
+        items, delta_link = self.list_changes(full=force_reindex)
+        print(f"Found {len(items)} new or changed documents in SharePoint")
 
         results  = {"success": 0, "skipped": 0, "failed": 0, "errors": []}
 
-        for item in items:
-            print(f"\n{'─'*50}")
-            print(f"Processing: {item.name}")
-
-            local_path = None
-            try:
-                local_path = self.download_file(item)
-
-                request = IngestionRequest(
-                    file_path          = local_path,
-                    source_type        = item.source_type,
-                    sector             = item.sector,
-                    donor              = item.donor,
-                    year               = item.document_year,
-                    client             = item.client_name,
-                    won                = item.won,
-                    sharepoint_item_id = item.item_id,
-                    sharepoint_url     = item.web_url,
-                )
-
-                result = self.pipeline.ingest(request)
-
-                if result.success:
-                    results["success"] += 1
-                    print(f"✓ {result.chunks_stored} chunks stored")
-                else:
-                    results["failed"] += 1
-                    results["errors"].append({"file": item.name, "error": result.error})
-                    print(f"✗ Failed: {result.error}")
-
-            except Exception as e:
-                results["failed"] += 1
-                results["errors"].append({"file": item.name, "error": str(e)})
-                print(f"✗ Exception: {e}")
-
-            finally:
-                # Always clean up the temp file
-                if local_path and os.path.exists(local_path):
-                    os.unlink(local_path)
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        with ThreadPoolExecutor(max_workers=max(1, download_concurrency)) as pool:
+            queue   = iter(items)
+            pending = {}    # download future → item
+
+            def submit_next():
+                for item in queue:
+                    # Unchanged since it was last ingested — skip the download entirely
+                    if not force_reindex and self.state.is_current(item):
+                        results["skipped"] += 1
+                        print(f"- Unchanged, skipped: {item.name}")
+                        continue
+                    pending[pool.submit(self._download, item)] = item
+                    return
+
+            # Keep at most download_concurrency files downloading or waiting to be
+            # ingested, so temp files on disk stay bounded on large libraries
+            for _ in range(max(1, download_concurrency)):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    self._ingest_downloaded(item, future, results, force_reindex)
+                    submit_next()
+
+        if results["success"]:
+            self.pipeline.refresh_stats()
+
+        # Only move the delta cursor past a fully successful sync, so failed
+        # items are offered again next time
+        if delta_link and not results["failed"]:
+            self.state.set_delta_link(self._get_list_id(), delta_link)
 
         print(f"\n{'═'*50}")
         print(f"Sync complete: {results['success']} success, {results['skipped']} skipped, {results['failed']} failed")
         return results
 
+    def _ingest_downloaded(self, item: SharePointItem, download, results: dict, force_reindex: bool) -> None:
+        """Ingest one finished download (a future from _download) and tally the outcome."""
+        print(f"\n{'─'*50}")
+        print(f"Processing: {item.name}")
+
+        local_path = None
+        try:
+            local_path, sha1 = download.result()
+
+            # Modified in SharePoint (e.g. a metadata edit) but the bytes are the same
+            if not force_reindex and self.state.content_hash(item.item_id) == sha1:
+                results["skipped"] += 1
+                self.state.record(item, sha1)
+                print("- Content unchanged, skipped")
+                return
+
+            request = IngestionRequest(
+                file_path          = local_path,
+                source_type        = item.source_type,
+                sector             = item.sector,
+                donor              = item.donor,
+                year               = item.document_year,
+                client             = item.client_name,
+                won                = item.won,
+                sharepoint_item_id = item.item_id,
+                sharepoint_url     = item.web_url,
+                # A changed item replaces the chunks of its previous version
+                replace_existing   = True,
+            )
+
+            result = self.pipeline.ingest(request)
+
+            if result.success:
+                results["success"] += 1
+                self.state.record(item, sha1)
+                print(f"✓ {result.chunks_stored} chunks stored")
+            else:
+                results["failed"] += 1
+                results["errors"].append({"file": item.name, "error": result.error})
+                print(f"✗ Failed: {result.error}")
+
+        except Exception as e:
+            results["failed"] += 1
+            results["errors"].append({"file": item.name, "error": str(e)})
+            print(f"✗ Exception: {e}")
+
+        finally:
+            # Always clean up the temp file
+            if local_path and os.path.exists(local_path):
+                os.unlink(local_path)
+
+
+# ── SYNC STATE ────────────────────────────────────────────────────────────────
+
+class SyncState:
+    """
+    SQLite record of each SharePoint item as it was when last ingested:
+    lastModifiedDateTime, size and content SHA-1. Lets a sync skip items
+    that haven't changed without downloading them.
+    """
+
+    def __init__(self, path: str):
+        self.path  = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS synced ("
+                "item_id TEXT PRIMARY KEY, modified_at TEXT, size_bytes INTEGER, sha1 TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS delta (list_id TEXT PRIMARY KEY, link TEXT)"
+            )
+        return self._conn
+
+    def _row(self, item_id: str):
+        with self._lock:
+            return self._get_conn().execute(
+                "SELECT modified_at, size_bytes, sha1 FROM synced WHERE item_id = ?", (item_id,)
+            ).fetchone()
+
+    def is_current(self, item: SharePointItem) -> bool:
+        row = self._row(item.item_id)
+        return row is not None and item.modified_at != "" and row[:2] == (item.modified_at, item.size_bytes)
+
+    def content_hash(self, item_id: str) -> Optional[str]:
+        row = self._row(item_id)
+        return row[2] if row else None
+
+    def delta_link(self, list_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT link FROM delta WHERE list_id = ?", (list_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_delta_link(self, list_id: str, link: str) -> None:
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("INSERT OR REPLACE INTO delta (list_id, link) VALUES (?, ?)", (list_id, link))
+            conn.commit()
+
+    def record(self, item: SharePointItem, sha1: str) -> None:
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO synced (item_id, modified_at, size_bytes, sha1) VALUES (?, ?, ?, ?)",
+                (item.item_id, item.modified_at, item.size_bytes, sha1),
+            )
+            conn.commit()
+
 
 # ── HELPERS ───────────────────────────────────────────────────────────────────
 
+# SharePoint Document_Category column → SourceType value
+_SOURCE_TYPE_MAP = {
+    "Proposal":        "proposal",
+    "Past Proposal":   "proposal",
+    "RFP":             "rfp",
+    "Tender":          "rfp",
+    "CV":              "cv",
+    "Certificate":     "certificate",
+    "Project Report":  "project",
+    "Methodology":     "methodology",
+    "Financial":       "financial",
+}
+
+_WON_VALUES = frozenset({"yes", "true", "won", "1"})
+
+# Graph responses worth retrying: throttling and transient server errors
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _with_retry(fetch):
+    """
+    Call fetch() — one Graph request — retrying up to GRAPH_MAX_ATTEMPTS times
+    on a retryable status or a dropped connection. Sleeps for the response's
+    Retry-After when Graph sends one, else for a jittered exponential backoff,
+    so one throttled download waits without failing the whole sync.
+    """
+    import httpx
+
+    for attempt in range(1, GRAPH_MAX_ATTEMPTS + 1):
+        try:
+            return fetch()
+        except httpx.HTTPStatusError as e:
+            if attempt == GRAPH_MAX_ATTEMPTS or e.response.status_code not in _RETRY_STATUSES:
+                raise
+            delay = _retry_after(e.response)
+        except httpx.TransportError:
+            if attempt == GRAPH_MAX_ATTEMPTS:
+                raise
+            delay = None
+
+        if delay is None:
+            backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_MIN * 2 ** (attempt - 1))
+            delay   = random.uniform(backoff / 2, backoff)
+        time.sleep(delay)
+
+
+def _retry_after(response) -> Optional[float]:
+    """Seconds from a Retry-After header (Graph sends delta-seconds), if any."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def _parse_list_item(item: dict) -> Optional[SharePointItem]:
+    """
+    SharePointItem for one Graph listItem (with expanded fields and driveItem),
+    or None for folders, deleted items and unsupported file types.
+    """
+    fields     = item.get("fields", {})
+    drive_item = item.get("driveItem", {})
+
+    # Skip folders and (delta query) deletions
+    if drive_item.get("folder") or "deleted" in item:
+        return None
+
+    # Only process supported file types
+    name = fields.get("FileLeafRef", drive_item.get("name", ""))
+    if not name or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+        return None
+
+    return SharePointItem(
+        item_id      = item["id"],
+        name         = name,
+        web_url      = drive_item.get("webUrl", ""),
+        download_url = drive_item.get("@microsoft.graph.downloadUrl", ""),
+        size_bytes   = drive_item.get("size", 0),
+        modified_at  = drive_item.get("lastModifiedDateTime", ""),
+
+        # Custom columns — map from your SharePoint column names
+        category     = fields.get("Document_Category", ""),
+        expiry_date  = fields.get("Expiry_Date", ""),
+        sector       = fields.get("BidVault_Sector", ""),
+        donor        = fields.get("BidVault_Donor", ""),
+        source_type  = _map_source_type(fields.get("Document_Category", "")),
+        client_name  = fields.get("Client_Name", ""),
+        won          = _parse_won(fields.get("Bid_Won")),
+        document_year= _parse_year(fields.get("Document_Year")),
+    )
+
+
 def _map_source_type(category: str) -> str:
     """Map SharePoint Document_Category column to SourceType enum."""
-    mapping = {
-        "Proposal":        "proposal",
-        "Past Proposal":   "proposal",
-        "RFP":             "rfp",
-        "Tender":          "rfp",
-        "CV":              "cv",
-        "Certificate":     "certificate",
-        "Project Report":  "project",
-        "Methodology":     "methodology",
-        "Financial":       "financial",
-    }
-    return mapping.get(category, "other")
+    return _SOURCE_TYPE_MAP.get(category, "other")
 
 
 def _parse_won(value) -> Optional[bool]:
@@ -337,7 +623,7 @@ def _parse_won(value) -> Optional[bool]:
     if isinstance(value, bool):
         return value
     if isinstance(value, str):
-        return value.lower() in ("yes", "true", "won", "1")
+        return value.lower() in _WON_VALUES
     return None
 
 
@@ -17,18 +17,32 @@ ENVIRONMENT VARIABLES:
   AZURE_OPENAI_API_KEY — for generating embeddings
   AZURE_OPENAI_ENDPOINT
   AZURE_OPENAI_EMBEDDING_DEPLOYMENT — e.g. "text-embedding-3-large"
+  HNSW_MAINTENANCE_WORK_MEM — maintenance_work_mem for the HNSW index build (default 1GB)
+  HNSW_ITERATIVE_SCAN  — hnsw.iterative_scan for searches: strict_order (default),
+                         relaxed_order, or off (pgvector < 0.8)
+  DATABASE_POOL_MIN / DATABASE_POOL_MAX — connections kept open / at most open
+                                          per VectorStore (default 2 / 16)
 """
 
+import asyncio
+import io
 import os
-import json
+import struct
+import threading
+import time
 import uuid
+import weakref
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Optional
+
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from .metadata import DocumentMetadata
+from .embedder import get_query_batcher
 
 
 # Default to 384 for local fastembed (bge-small-en-v1.5)
@@ -65,13 +79,139 @@ CREATE INDEX IF NOT EXISTS idx_chunks_section_type ON document_chunks (section_t
 CREATE INDEX IF NOT EXISTS idx_chunks_year         ON document_chunks (year);
 CREATE INDEX IF NOT EXISTS idx_chunks_won          ON document_chunks (won);
 CREATE INDEX IF NOT EXISTS idx_chunks_document_id  ON document_chunks (document_id);
+CREATE INDEX IF NOT EXISTS idx_chunks_sharepoint_item ON document_chunks ((metadata->>'sharepoint_item_id'));
+
+-- Chunk counts for stats(), so monitoring doesn't aggregate the whole table on
+-- every call. Kept current by VectorStore().refresh_stats(); the unique index
+-- lets it refresh CONCURRENTLY (readers are never blocked).
+CREATE MATERIALIZED VIEW IF NOT EXISTS chunk_stats AS
+    SELECT COALESCE(source_type, 'other') AS source_type,
+           COALESCE(sector, 'general')    AS sector,
+           COUNT(*)                       AS count
+    FROM document_chunks
+    GROUP BY 1, 2;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_chunk_stats_key ON chunk_stats (source_type, sector);
+
+-- One-row counter behind VectorStore().corpus_version(), for caches of answers
+-- derived from the chunks. A statement trigger bumps it inside every writing
+-- transaction, so the new version commits (or rolls back) with the rows.
+CREATE TABLE IF NOT EXISTS corpus_version (
+    id              BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version         BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO corpus_version DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_corpus_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE corpus_version SET version = version + 1;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_chunks_corpus_version') THEN
+        CREATE TRIGGER trg_chunks_corpus_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON document_chunks
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_corpus_version();
+    END IF;
+END $$;
+
+-- pgvector HNSW index for fast approximate nearest-neighbour search:
+-- VectorStore().create_table() creates it with the table (HNSW_INDEX_SQL or
+-- BINARY_HNSW_INDEX_SQL). HNSW needs no training data, so an empty index is
+-- fine; new rows are added to the graph as they are inserted.
+-- For a large bulk load, inserting into a plain table and building the graph
+-- once afterwards is much faster:
+--   store.drop_hnsw_index(); <ingest>; store.create_hnsw_index()
+"""
+
+# Embeddings are stored L2-normalized, so cosine similarity is the plain dot
+# product and the indexes use inner-product ops (<#>: no norms computed per
+# comparison). Databases created with the earlier cosine indexes
+# (idx_chunks_embedding_hnsw / _half_hnsw) get these built alongside by
+# create_table(); drop the old ones once they are.
+HNSW_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_ip_hnsw ON document_chunks
+    USING hnsw (embedding vector_ip_ops)
+    WITH (m = %s, ef_construction = %s);
+"""
 
--- pgvector HNSW index for fast approximate nearest-neighbour search
--- Build AFTER data is loaded for best performance
--- CREATE INDEX ON document_chunks USING hnsw (embedding vector_cosine_ops)
---     WITH (m = 16, ef_construction = 64);
+# Half-precision index (pgvector >= 0.7): the graph holds FP16 copies of the
+# embeddings, half the size of the FP32 index, so each distance computation
+# during traversal reads half the bytes. Used with quantization="half".
+HALF_HNSW_INDEX_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_half_ip_hnsw ON document_chunks
+    USING hnsw ((embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_ip_ops)
+    WITH (m = %s, ef_construction = %s);
 """
 
+# 1-bit quantized index (pgvector >= 0.7): 32x smaller than the float vectors,
+# compared by Hamming distance. Used with quantization="binary"; the top
+# candidates are re-ranked with the full-precision embedding.
+BINARY_HNSW_INDEX_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_bq_hnsw ON document_chunks
+    USING hnsw ((binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops)
+    WITH (m = %s, ef_construction = %s);
+"""
+
+# HNSW index name per quantization mode (see create_hnsw_index / drop_hnsw_index)
+HNSW_INDEX_NAMES = {
+    None:     "idx_chunks_embedding_ip_hnsw",
+    "half":   "idx_chunks_embedding_half_ip_hnsw",
+    "binary": "idx_chunks_embedding_bq_hnsw",
+}
+
+# Partial HNSW indexes for hot filter combinations: name suffix → conditions.
+# Each gets its own graph over just the matching rows (built next to the full
+# index, same quantization), so a filtered search walks a small graph in
+# which every candidate passes the filter. search() writes these filter values
+# into its SQL as literals, which the planner needs to match a partial index
+# (a bound parameter can't prove the predicate). Adding an entry here is how
+# to scale another common filter; create_hnsw_index() builds it.
+PARTIAL_HNSW_INDEXES = {
+    "won_proposals": ("source_type = 'proposal'", "won = TRUE"),   # search_by_section
+}
+_PARTIAL_INDEX_CONDITIONS = {c for conditions in PARTIAL_HNSW_INDEXES.values() for c in conditions}
+
+# HNSW build parameters (higher = better recall, slower build / bigger index)
+HNSW_M               = 16
+HNSW_EF_CONSTRUCTION = 64
+
+# Memory for the index build; a build that outgrows it spills to disk and
+# slows down sharply
+HNSW_MAINTENANCE_WORK_MEM = os.environ.get("HNSW_MAINTENANCE_WORK_MEM", "1GB")
+
+# Candidate list size per HNSW search (pgvector's default). Higher = better
+# recall, slower queries. Without iterative scans a query returns at most
+# ef_search rows, fewer when the WHERE filters drop candidates.
+EF_SEARCH = 40
+
+# Iterative index scans (pgvector >= 0.8): when filters reject candidates the
+# HNSW scan keeps going (up to hnsw.max_scan_tuples, 20,000 by default) until
+# LIMIT rows pass, instead of returning short. pgvector leaves this "off"; it
+# has to be opted into per session / transaction. "strict_order" keeps results
+# exactly distance-ordered, "relaxed_order" is faster; set "off" for older
+# pgvector, which rejects the setting.
+ITERATIVE_SCAN       = os.environ.get("HNSW_ITERATIVE_SCAN", "strict_order")
+ITERATIVE_SCAN_MODES = ("off", "strict_order", "relaxed_order")
+
+# store_chunks_batch loads rows with binary COPY: these columns, in this order
+COPY_COLUMNS = (
+    "id", "document_id", "chunk_index", "text", "embedding", "metadata",
+    "source_type", "sector", "donor", "section_type", "year", "won",
+)
+
+# Connection pool per VectorStore. Up to POOL_MAX operations run at once (more
+# wait for a free connection); POOL_MIN connections stay open between calls,
+# any beyond that are closed when returned.
+POOL_MIN = int(os.environ.get("DATABASE_POOL_MIN", "2"))
+POOL_MAX = int(os.environ.get("DATABASE_POOL_MAX", "16"))
+
+# Distinct filter combinations kept as prepared search statements per connection
+MAX_PREPARED_SEARCHES = 64
+
+QUANTIZATION_MODES = (None, "half", "binary")
+RERANK_FACTOR      = 4   # binary mode fetches top_k * RERANK_FACTOR candidates
+
 
 # ── DATA CLASSES ──────────────────────────────────────────────────────────────
 
@@ -104,119 +244,365 @@ class SearchFilters:
 class VectorStore:
     """
     Wraps pgvector operations. One instance per application.
-    Call VectorStore() and reuse — it manages its own connection pool.
+    Call VectorStore() and reuse — it manages its own connection pool, so
+    concurrent requests each get their own connection.
+
+    quantization="half" searches an FP16 (halfvec) HNSW index — half the memory
+    traffic per distance, negligible recall loss for 384-dim embeddings.
+    quantization="binary" searches a 1-bit quantized HNSW index first and
+    re-ranks the top_k * rerank_factor candidates with exact cosine distance.
+    Rows are stored at full precision either way, L2-normalized.
+
+    ef_search is the HNSW candidate list size for every search (hnsw.ef_search);
+    raise it for better recall at the cost of latency. iterative_scan sets
+    hnsw.iterative_scan, so filtered searches still fill top_k (see ITERATIVE_SCAN).
     """
 
-    def __init__(self, database_url: Optional[str] = None):
-        self.database_url = database_url or os.environ["DATABASE_URL"]
-        self._conn = None
+    def __init__(
+        self,
+        database_url:   Optional[str] = None,
+        quantization:   Optional[str] = None,
+        rerank_factor:  int = RERANK_FACTOR,
+        ef_search:      int = EF_SEARCH,
+        iterative_scan: str = ITERATIVE_SCAN,
+    ):
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"quantization must be one of {QUANTIZATION_MODES}, got {quantization!r}")
+        if iterative_scan not in ITERATIVE_SCAN_MODES:
+            raise ValueError(f"iterative_scan must be one of {ITERATIVE_SCAN_MODES}, got {iterative_scan!r}")
+        self.database_url   = database_url or os.environ["DATABASE_URL"]
+        self.quantization   = quantization
+        self.rerank_factor  = rerank_factor
+        self.ef_search      = ef_search
+        self.iterative_scan = iterative_scan
+        self._pool       = None
+        self._pool_lock  = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(POOL_MAX)
+        # Search statements by filter shape, and which are prepared on which connection
+        self._statements      = {}
+        self._prepared_on     = weakref.WeakKeyDictionary()
+        self._statements_lock = threading.Lock()
+        # Connection held by transaction(), per thread
+        self._local = threading.local()
+
+    def _get_pool(self):
+        """Lazy pool — only connects when first used."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    try:
+                        import psycopg2.extras
+                        import psycopg2.pool
+                    except ImportError:
+                        raise ImportError("Run: pip install psycopg2-binary")
+                    psycopg2.extras.register_uuid()
+                    # Search results' metadata JSONB is decoded with orjson
+                    psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        min(POOL_MIN, POOL_MAX), POOL_MAX, dsn=self.database_url
+                    )
+        return self._pool
+
+    @contextmanager
+    def _connection(self):
+        """
+        Check out a pooled connection for one operation. Waits while all POOL_MAX
+        are in use (the pool itself would raise). Uncommitted work is rolled
+        back when the connection goes back to the pool.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:    # inside transaction() on this thread
+            yield conn
+            return
+
+        pool = self._get_pool()
+        with self._pool_slots:
+            conn = pool.getconn()
+            if conn.closed:     # dropped by the server since its last use
+                pool.putconn(conn, close=True)
+                conn = pool.getconn()
+            try:
+                yield conn
+            finally:
+                pool.putconn(conn, close=bool(conn.closed))
+
+    def _commit(self, conn) -> None:
+        """Commit, unless the work belongs to an enclosing transaction()."""
+        if getattr(self._local, "conn", None) is not conn:
+            conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several store calls on one connection as a single transaction:
 
-    def _get_conn(self):
-        """Lazy connection — only connects when first used."""
-        if self._conn is None or self._conn.closed:
+            with store.transaction():
+                store.delete_by_document(doc_id)
+                store.store_chunks_batch(items)
+
+        Calls made on this thread inside the block share the connection and
+        commit together when it exits; an exception rolls all of them back.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield       # nested: the outer block commits
+            return
+
+        with self._connection() as conn:
+            self._local.conn = conn
             try:
-                import psycopg2
-                import psycopg2.extras
-            except ImportError:
-                raise ImportError("Run: pip install psycopg2-binary")
-            self._conn = psycopg2.connect(self.database_url)
-            psycopg2.extras.register_uuid(self._conn)
-        return self._conn
-
-    def create_table(self):
-        """Run once to set up the schema. Safe to call multiple times."""
-        conn = self._get_conn()
-        with conn.cursor() as cur:
-            cur.execute(CREATE_TABLE_SQL)
-        conn.commit()
+                yield
+                conn.commit()
+            except BaseException:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                self._local.conn = None
+
+    def create_table(self, force: bool = False):
+        """
+        Set up the schema and HNSW indexes. Safe to call multiple times: when
+        the table (with the expected columns), the stats view and this store's
+        indexes all exist, one catalog lookup replaces the DDL, whose IF NOT
+        EXISTS checks still take catalog locks. force=True runs the DDL anyway.
+        """
+        if not force and self._schema_ready():
+            print("✓ document_chunks table ready (already set up)")
+            return
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(CREATE_TABLE_SQL)
+            conn.commit()
         print("✓ document_chunks table ready")
+        self.create_hnsw_index()
+
+    def _schema_ready(self) -> bool:
+        """True if everything create_table() creates is already there."""
+        relations = [
+            "document_chunks", "chunk_stats", "idx_chunk_stats_key",
+            "idx_chunks_sharepoint_item", "corpus_version",
+        ]
+        relations += [name for name, _ in self._hnsw_indexes()]
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT
+                        (SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(%s::text[]) AS name),
+                        (SELECT array_agg(attname::text) FROM pg_attribute
+                         WHERE attrelid = to_regclass('document_chunks') AND attnum > 0 AND NOT attisdropped)
+                """, (relations,))
+                exists, columns = cur.fetchone()
+            self._commit(conn)
+        return bool(exists) and set(COPY_COLUMNS) <= set(columns or ())
+
+    def create_hnsw_index(
+        self,
+        m:               int  = HNSW_M,
+        ef_construction: int  = HNSW_EF_CONSTRUCTION,
+        concurrently:    bool = False,
+    ):
+        """
+        Build the HNSW index on embeddings (no-op if it exists). create_table()
+        already does this; call it directly to rebuild with other parameters, or
+        after a bulk load done without the index (see drop_hnsw_index).
+        Higher m / ef_construction = better recall, slower build.
+
+        concurrently=True builds with CREATE INDEX CONCURRENTLY: slower, but
+        inserts and searches keep running during the build.
+        """
+        statements = [sql for _, sql in self._hnsw_indexes()]
+        with self._connection() as conn:
+            if concurrently:
+                # CONCURRENTLY cannot run inside a transaction block
+                statements = [sql.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1) for sql in statements]
+                conn.autocommit = True
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute("SET maintenance_work_mem = %s", (HNSW_MAINTENANCE_WORK_MEM,))
+                        try:
+                            for sql in statements:
+                                cur.execute(sql, (int(m), int(ef_construction)))
+                        finally:
+                            cur.execute("RESET maintenance_work_mem")
+                finally:
+                    conn.autocommit = False
+            else:
+                with conn.cursor() as cur:
+                    # Only for this transaction, i.e. this build
+                    cur.execute("SET LOCAL maintenance_work_mem = %s", (HNSW_MAINTENANCE_WORK_MEM,))
+                    for sql in statements:
+                        cur.execute(sql, (int(m), int(ef_construction)))
+                conn.commit()
+        print(f"✓ HNSW index ready ({self.quantization or 'full precision'})")
+
+    def drop_hnsw_index(self):
+        """
+        Drop this store's HNSW indexes (full and partial). Before loading a large corpus, drop it,
+        run the ingest (rows then go into a plain heap, with no graph search
+        per insert), and call create_hnsw_index() once at the end; building
+        the graph in one pass is far faster than growing it row by row.
+        Searches fall back to exact (sequential) scans in between.
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                for name, _ in self._hnsw_indexes():
+                    cur.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+        print(f"✓ HNSW index dropped ({self.quantization or 'full precision'})")
+
+    def _hnsw_indexes(self) -> list[tuple]:
+        """(index name, CREATE INDEX SQL) for this quantization: the full index, then the partial ones."""
+        name = HNSW_INDEX_NAMES[self.quantization]
+        sql  = {
+            None:     HNSW_INDEX_SQL,
+            "half":   HALF_HNSW_INDEX_SQL,
+            "binary": BINARY_HNSW_INDEX_SQL,
+        }[self.quantization]
+        indexes = [(name, sql)]
+        for suffix, conditions in PARTIAL_HNSW_INDEXES.items():
+            partial = f"{name}_{suffix}"
+            indexes.append((
+                partial,
+                sql.replace(name, partial, 1).rstrip().rstrip(";") + f"\n    WHERE {' AND '.join(conditions)};\n",
+            ))
+        return indexes
 
     # ── WRITE ─────────────────────────────────────────────────────────────────
 
     def store_chunk(self, text: str, embedding: list[float], metadata: DocumentMetadata) -> str:
         """Store a single chunk. Returns the new chunk ID."""
-        chunk_id = str(uuid.uuid4())
-        conn     = self._get_conn()
-
+        chunk_id  = str(new_chunk_id())
         meta_dict = metadata.to_dict()
 
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO document_chunks
-                    (id, document_id, chunk_index, text, embedding, metadata,
-                     source_type, sector, donor, section_type, year, won)
-                VALUES
-                    (%s, %s, %s, %s, %s::vector, %s,
-                     %s, %s, %s, %s, %s, %s)
-            """, (
-                chunk_id,
-                metadata.document_id or None,
-                metadata.chunk_index,
-                text,
-                embedding,      # psycopg2 serialises list → pgvector format
-                json.dumps(meta_dict),
-                metadata.get("source_type", "other"),
-                metadata.get("sector", "general"),
-                metadata.get("donor", "other"),
-                metadata.get("section_type", "general"),
-                metadata.get("year") or None,
-                metadata.get("won"),
-            ))
-        conn.commit()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO document_chunks
+                        (id, document_id, chunk_index, text, embedding, metadata,
+                         source_type, sector, donor, section_type, year, won)
+                    VALUES
+                        (%s, %s, %s, %s, %s::vector, %s,
+                         %s, %s, %s, %s, %s, %s)
+                """, (
+                    chunk_id,
+                    metadata.document_id or None,
+                    metadata.chunk_index,
+                    text,
+                    _vector_literal(_unit(embedding)),
+                    _dump_metadata(meta_dict).decode(),
+                    metadata.get("source_type", "other"),
+                    metadata.get("sector", "general"),
+                    metadata.get("donor", "other"),
+                    metadata.get("section_type", "general"),
+                    metadata.get("year") or None,
+                    metadata.get("won"),
+                ))
+            self._commit(conn)
         return chunk_id
 
-    def store_chunks_batch(self, items: list[tuple]) -> int:
+    def store_chunks_batch(self, items: list[tuple], ids: Optional[list] = None) -> int:
         """
         Batch insert for performance.
         items: list of (text, embedding, DocumentMetadata)
+        ids:   optional chunk ids (uuid.UUID, see new_chunk_id), one per item,
+               for callers that need to find these rows again; generated otherwise
         Returns count of inserted chunks.
+
+        Rows are sent with COPY ... (FORMAT BINARY): embeddings travel as packed
+        float32s instead of text literals Postgres has to parse back into floats.
         """
         if not items:
             return 0
 
-        conn = self._get_conn()
-        rows = []
-
-        for text, embedding, metadata in items:
-            meta_dict = metadata.to_dict()
-            rows.append((
-                str(uuid.uuid4()),
-                metadata.document_id or None,
-                metadata.chunk_index,
-                text,
-                embedding,
-                json.dumps(meta_dict),
-                metadata.get("source_type", "other"),
-                metadata.get("sector", "general"),
-                metadata.get("donor", "other"),
-                metadata.get("section_type", "general"),
-                metadata.get("year") or None,
-                metadata.get("won"),
-            ))
-
-        with conn.cursor() as cur:
-            import psycopg2.extras
-            psycopg2.extras.execute_values(cur, """
-                INSERT INTO document_chunks
-                    (id, document_id, chunk_index, text, embedding, metadata,
-                     source_type, sector, donor, section_type, year, won)
-                VALUES %s
-            """, rows, template="""
-                (%s, %s, %s, %s, %s::vector, %s, %s, %s, %s, %s, %s, %s)
-            """)
-        conn.commit()
-        return len(rows)
+        buf = io.BytesIO()
+        buf.write(_COPY_HEADER)
+        for n, (text, embedding, metadata) in enumerate(items):
+            buf.write(_COPY_FIELD_COUNT)
+            _copy_field(buf, (ids[n] if ids is not None else new_chunk_id()).bytes)
+            _copy_field(buf, uuid.UUID(metadata.document_id).bytes if metadata.document_id else None)
+            _copy_field(buf, _INT4.pack(metadata.chunk_index))
+            _copy_field(buf, text.encode())
+            _copy_field(buf, _vector_binary(_unit(embedding)))
+            _copy_field(buf, b"\x01" + _dump_metadata(metadata.to_dict()))   # jsonb version 1
+            _copy_field(buf, _text_binary(metadata.get("source_type", "other")))
+            _copy_field(buf, _text_binary(metadata.get("sector", "general")))
+            _copy_field(buf, _text_binary(metadata.get("donor", "other")))
+            _copy_field(buf, _text_binary(metadata.get("section_type", "general")))
+            year = metadata.get("year")
+            _copy_field(buf, _INT4.pack(int(year)) if year else None)
+            won  = metadata.get("won")
+            _copy_field(buf, None if won is None else (b"\x01" if won else b"\x00"))
+        buf.write(_COPY_TRAILER)
+        buf.seek(0)
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.copy_expert(
+                    f"COPY document_chunks ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT BINARY)", buf
+                )
+            self._commit(conn)
+        return len(items)
 
     def delete_by_document(self, document_id: str) -> int:
         """Remove all chunks for a document (e.g. when re-indexing)."""
-        conn = self._get_conn()
-        with conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM document_chunks WHERE document_id = %s",
-                (document_id,)
-            )
-            count = cur.rowcount
-        conn.commit()
+        return self.delete_by_documents([document_id])
+
+    def delete_by_documents(self, document_ids: list[str], keep_ids: Optional[list] = None) -> int:
+        """
+        Remove all chunks for several documents in one statement, except the
+        chunk ids in keep_ids (e.g. a re-index's new chunks). Returns rows deleted.
+        """
+        if not document_ids:
+            return 0
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                # The ids travel as one uuid[] parameter, however many there are
+                if keep_ids:
+                    cur.execute(
+                        "DELETE FROM document_chunks WHERE document_id = ANY(%s::uuid[])"
+                        " AND NOT id = ANY(%s::uuid[])",
+                        (list(document_ids), [str(i) for i in keep_ids])
+                    )
+                else:
+                    cur.execute(
+                        "DELETE FROM document_chunks WHERE document_id = ANY(%s::uuid[])",
+                        (list(document_ids),)
+                    )
+                count = cur.rowcount
+            self._commit(conn)
+        return count
+
+    def delete_by_sharepoint_items(self, item_ids: list[str], keep_ids: Optional[list] = None) -> int:
+        """
+        Remove all chunks ingested from these SharePoint items, except the chunk
+        ids in keep_ids (a changed item's new chunks). Returns rows deleted.
+        """
+        if not item_ids:
+            return 0
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                # Matches the idx_chunks_sharepoint_item expression index
+                cur.execute(
+                    "DELETE FROM document_chunks WHERE metadata->>'sharepoint_item_id' = ANY(%s::text[])"
+                    " AND NOT id = ANY(%s::uuid[])",
+                    (list(item_ids), [str(i) for i in keep_ids or []])
+                )
+                count = cur.rowcount
+            self._commit(conn)
+        return count
+
+    def delete_chunks(self, chunk_ids: list) -> int:
+        """Remove chunks by id (e.g. those of a document whose ingest failed part-way)."""
+        if not chunk_ids:
+            return 0
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM document_chunks WHERE id = ANY(%s::uuid[])",
+                    ([str(i) for i in chunk_ids],)
+                )
+                count = cur.rowcount
+            self._commit(conn)
         return count
 
     # ── SEARCH ────────────────────────────────────────────────────────────────
@@ -227,35 +613,36 @@ class VectorStore:
         filters:            Optional[SearchFilters] = None,
         top_k:              int = 8,
         min_similarity:     float = 0.5,
+        ef_search:          Optional[int] = None,
     ) -> list[StoredChunk]:
         """
-        Semantic search using cosine similarity.
+        Semantic search using cosine similarity (inner product of unit vectors).
         Apply pre-filters before vector search for performance.
 
+        ef_search overrides the store's ef_search (default 40) for this query;
+        raise it for better recall at the cost of latency. With iterative_scan
+        "off" it must be >= top_k, and filtered searches may return fewer rows.
+
         Returns top_k chunks sorted by similarity (highest first).
         """
-        conn    = self._get_conn()
         filters = filters or SearchFilters()
 
         # Build WHERE clause from filters
         conditions = []
         params     = []
 
-        if filters.source_type:
-            conditions.append("source_type = %s")
-            params.append(filters.source_type)
-
-        if filters.sector:
-            conditions.append("sector = %s")
-            params.append(filters.sector)
-
-        if filters.donor:
-            conditions.append("donor = %s")
-            params.append(filters.donor)
-
-        if filters.section_type:
-            conditions.append("section_type = %s")
-            params.append(filters.section_type)
+        for column in ("source_type", "sector", "donor", "section_type"):
+            value = getattr(filters, column)
+            if not value:
+                continue
+            # Values in a partial index's predicate go in as literals so the
+            # planner can pick that index (only these known constants are inlined)
+            literal = f"{column} = '{value}'"
+            if literal in _PARTIAL_INDEX_CONDITIONS:
+                conditions.append(literal)
+            else:
+                conditions.append(f"{column} = %s")
+                params.append(value)
 
         if filters.year_min:
             conditions.append("year >= %s")
@@ -272,30 +659,39 @@ class VectorStore:
             conditions.append("document_id = %s")
             params.append(filters.document_id)
 
-        where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
-
-        # pgvector cosine similarity: 1 - (embedding <=> query)
-        # <=> is the cosine distance operator
-        query = f"""
-            SELECT * FROM (
-                SELECT
-                    id,
-                    text,
-                    metadata,
-                    1 - (embedding <=> %s::vector) AS similarity
-                FROM document_chunks
-                {where_clause}
-            ) AS subquery
-            WHERE similarity >= %s
-            ORDER BY similarity DESC
-            LIMIT %s
-        """
-
-        all_params = [query_embedding] + params + [min_similarity, top_k]
-
-        with conn.cursor() as cur:
-            cur.execute(query, all_params)
-            rows = cur.fetchall()
+        # The query vector, then the filter values, then the LIMIT / threshold values
+        if self.quantization == "binary":
+            tail = [top_k * self.rerank_factor, top_k, -min_similarity]
+        else:
+            tail = [top_k, -min_similarity]
+        all_params = [_vector_literal(_unit(query_embedding))] + params + tail
+
+        # Each filter shape is parsed and planned once per connection (PREPARE),
+        # then run with EXECUTE; only the parameter values travel per search
+        name, query, prepared_query = self._search_statement(tuple(conditions))
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                # SET LOCAL only lasts until the end of the transaction; both
+                # settings go in one round trip
+                if self.iterative_scan == "off":
+                    cur.execute("SET LOCAL hnsw.ef_search = %s", (int(ef_search or self.ef_search),))
+                else:
+                    cur.execute(
+                        "SET LOCAL hnsw.ef_search = %s; SET LOCAL hnsw.iterative_scan = %s",
+                        (int(ef_search or self.ef_search), self.iterative_scan),
+                    )
+                if name is None:
+                    cur.execute(query, all_params)
+                else:
+                    with self._statements_lock:
+                        prepared = self._prepared_on.setdefault(conn, set())
+                    if name not in prepared:
+                        cur.execute(f"PREPARE {name} AS {prepared_query}")
+                        prepared.add(name)
+                    cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(all_params))})", all_params)
+                rows = cur.fetchall()
+            self._commit(conn)
 
         results = []
         for row_id, text, meta_json, similarity in rows:
@@ -309,6 +705,95 @@ class VectorStore:
 
         return results
 
+    async def search_text(
+        self,
+        text:       str,
+        embedder=None,
+        **kwargs,
+    ) -> list[StoredChunk]:
+        """
+        Embed `text` and search with it (keyword arguments as for search()).
+        Concurrent calls on one event loop share embed_batch calls through
+        the QueryBatcher; `embedder` defaults to the process-wide one.
+        """
+        query_embedding = await get_query_batcher(embedder).embed(text)
+        return await asyncio.to_thread(self.search, query_embedding, **kwargs)
+
+    def _search_statement(self, conditions: tuple) -> tuple:
+        """
+        (statement name, SQL with %s placeholders, same SQL with $n placeholders)
+        for a search with these WHERE conditions, built once per shape. The name
+        is None once MAX_PREPARED_SEARCHES shapes exist; such searches run unprepared.
+        """
+        with self._statements_lock:
+            statement = self._statements.get(conditions)
+            if statement is not None:
+                return statement
+
+            where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+            # <#> is pgvector's negative inner product; on unit vectors
+            # similarity (cosine) = -distance.
+            # The query vector is bound and parsed once (CTE q) and each row's
+            # distance computed once: the inner ORDER BY distance LIMIT k is the
+            # shape the HNSW index serves, and the min_similarity cut-off is a
+            # plain WHERE on that distance outside it (inside, it would drop rows
+            # from the index scan's candidate list instead of from the top k, and
+            # an iterative scan would keep searching for rows that never come).
+            # The filter conditions stay inside, where the iterative scan
+            # keeps pulling candidates until LIMIT of them pass.
+            if self.quantization == "binary":
+                # Coarse pass on the bit index, exact re-rank of the candidates
+                query = f"""
+                    WITH q AS (SELECT %s::vector AS v)
+                    SELECT id, text, metadata, -distance AS similarity FROM (
+                        SELECT id, text, metadata, embedding <#> (SELECT v FROM q) AS distance
+                        FROM (
+                            SELECT id, text, metadata, embedding
+                            FROM document_chunks
+                            {where_clause}
+                            ORDER BY binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})
+                                 <~> binary_quantize((SELECT v FROM q))
+                            LIMIT %s
+                        ) AS candidates
+                        ORDER BY distance
+                        LIMIT %s
+                    ) AS nearest
+                    WHERE distance <= %s
+                    ORDER BY distance
+                """
+            else:
+                # Half mode compares the same expression its index is built on
+                if self.quantization == "half":
+                    column, vector_type = f"embedding::halfvec({EMBEDDING_DIMENSIONS})", f"halfvec({EMBEDDING_DIMENSIONS})"
+                else:
+                    column, vector_type = "embedding", "vector"
+                query = f"""
+                    WITH q AS (SELECT %s::{vector_type} AS v)
+                    SELECT id, text, metadata, -distance AS similarity FROM (
+                        SELECT
+                            id,
+                            text,
+                            metadata,
+                            {column} <#> (SELECT v FROM q) AS distance
+                        FROM document_chunks
+                        {where_clause}
+                        ORDER BY distance
+                        LIMIT %s
+                    ) AS nearest
+                    WHERE distance <= %s
+                    ORDER BY distance
+                """
+
+            # $1..$n in the order the %s placeholders appear
+            pieces         = query.split("%s")
+            prepared_query = pieces[0] + "".join(f"${i}{piece}" for i, piece in enumerate(pieces[1:], 1))
+
+            name = None
+            if len(self._statements) < MAX_PREPARED_SEARCHES:
+                name = f"bidvault_search_{len(self._statements)}"
+            statement = self._statements[conditions] = (name, query, prepared_query)
+            return statement
+
     def search_by_section(
         self,
         query_embedding: list[float],
@@ -321,7 +806,8 @@ class VectorStore:
         """
         Convenience method for the most common retrieval pattern:
         'Find similar [section_type] chunks from [sector] proposals for [donor]'.
-        Used by the Drafting Agent.
+        Used by the Drafting Agent. With won_only (the default) it is served
+        by the won_proposals partial HNSW index (see PARTIAL_HNSW_INDEXES).
         """
         filters = SearchFilters(
             source_type  = "proposal",
@@ -335,16 +821,14 @@ class VectorStore:
     # ── STATS ─────────────────────────────────────────────────────────────────
 
     def stats(self) -> dict:
-        """Return counts by source_type and sector — useful for monitoring."""
-        conn = self._get_conn()
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT source_type, sector, COUNT(*) as count
-                FROM document_chunks
-                GROUP BY source_type, sector
-                ORDER BY count DESC
-            """)
-            rows = cur.fetchall()
+        """
+        Return counts by source_type and sector — useful for monitoring.
+        Read from the chunk_stats view, i.e. as of the last refresh_stats().
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT source_type, sector, count FROM chunk_stats ORDER BY count DESC")
+                rows = cur.fetchall()
 
         return {
             "by_source_and_sector": [
@@ -353,3 +837,93 @@ class VectorStore:
             ],
             "total": sum(r[2] for r in rows),
         }
+
+    def refresh_stats(self):
+        """Recompute chunk_stats. Runs CONCURRENTLY, so stats() keeps answering meanwhile."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY chunk_stats")
+            self._commit(conn)
+
+    def corpus_version(self) -> int:
+        """
+        A number that changes whenever chunks are inserted, updated or deleted,
+        for caches of answers derived from the corpus. Read from the
+        corpus_version row, which a trigger bumps in the writing transaction.
+        """
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COALESCE((SELECT version FROM corpus_version), 0)")
+                version = int(cur.fetchone()[0])
+            self._commit(conn)
+        return version
+
+
+# ── BINARY COPY ENCODING ──────────────────────────────────────────────────────
+# PostgreSQL binary COPY: a header, then per row a field count and each field
+# as a length-prefixed value in the column type's binary ("send") format
+# (-1 length = NULL), then a -1 trailer. All integers are big-endian.
+
+_COPY_HEADER      = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)  # no flags, no extension
+_COPY_FIELD_COUNT = struct.pack("!h", len(COPY_COLUMNS))
+_COPY_TRAILER     = struct.pack("!h", -1)
+_INT4             = struct.Struct("!i")
+_NULL             = _INT4.pack(-1)
+
+
+def _copy_field(buf: io.BytesIO, value: Optional[bytes]) -> None:
+    if value is None:
+        buf.write(_NULL)
+    else:
+        buf.write(_INT4.pack(len(value)))
+        buf.write(value)
+
+
+def _text_binary(value) -> Optional[bytes]:
+    # str.encode, not str(): str() of a (str, Enum) member such as Sector.HEALTH
+    # gives "Sector.HEALTH", while its encoded value is "health"
+    if value is None:
+        return None
+    return value.encode() if isinstance(value, str) else str(value).encode()
+
+
+def _unit(embedding):
+    """The embedding as an L2-normalized float32 array (a zero vector stays zero)."""
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Run: pip install numpy")
+    v = np.asarray(embedding, dtype=np.float32)
+    return v / (np.linalg.norm(v) + 1e-12)
+
+
+def _vector_binary(embedding) -> bytes:
+    """pgvector's binary vector: int16 dimensions, int16 unused, float32 values."""
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Run: pip install numpy")
+    values = np.asarray(embedding, dtype=">f4")
+    return struct.pack("!hh", len(values), 0) + values.tobytes()
+
+
+def new_chunk_id() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit Unix milliseconds, then
+    random bits. Chunk ids stored together sort together, so primary-key
+    inserts append to the right edge of the B-tree instead of random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76    # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62    # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+def _dump_metadata(meta_dict: dict) -> bytes:
+    """Metadata as JSON bytes (orjson; non-str keys become strings, as with json.dumps)."""
+    return orjson.dumps(meta_dict, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _vector_literal(embedding) -> str:
+    """pgvector text form ('[0.1,0.2,...]'), bound as an untyped literal."""
+    return "[" + ",".join(map(str, embedding)) + "]"
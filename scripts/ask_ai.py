@@ -8,31 +8,217 @@ and uses Groq (Llama 3) to provide a human-like answer based on the retrieved co
 
 import os
 import sys
-from groq import Groq
+import time
+import sqlite3
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
 from dotenv import load_dotenv
 from bidvault.ingestion.vector_store import VectorStore
-from bidvault.ingestion.embedder import Embedder
+from bidvault.ingestion.embedder import get_embedder
+from bidvault._groq import SYSTEM_PROMPT_ASK, get_client
 
 # Load environment variables (GROQ_API_KEY)
 load_dotenv()
 
-def ask_bidvault(question: str):
+# Answers are reused for questions whose embedding is at least this similar
+# to a previously answered one, while the corpus is unchanged (see
+# VectorStore.corpus_version) and for at most CACHE_TTL_S seconds.
+CACHE_PATH      = os.environ.get("ASK_CACHE_PATH", os.path.join(".bidvault_cache", "ask_cache.sqlite3"))
+CACHE_THRESHOLD = 0.95
+CACHE_MAX_SIZE  = 512
+CACHE_TTL_S     = float(os.environ.get("ASK_CACHE_TTL", "86400"))
+
+
+class SemanticCache:
+    """
+    Question → answer cache keyed on the question embedding.
+    A lookup hits when a cached question has cosine similarity >= threshold,
+    which skips both the vector search and the Groq round-trip.
+    Least-recently-used entries are evicted once max_entries is reached.
+    Entries are dropped once the corpus version they were answered against
+    changes (documents ingested / re-indexed) or they are older than ttl.
+    Entries persist in SQLite, like the intake and embedding caches; the
+    vectors are also held in memory as one matrix for the similarity scan.
+    """
+
+    def __init__(
+        self,
+        path:        str = CACHE_PATH,
+        threshold:   float = CACHE_THRESHOLD,
+        max_entries: int = CACHE_MAX_SIZE,
+        ttl:         float = CACHE_TTL_S,
+    ):
+        self.path        = path
+        self.threshold   = threshold
+        self.max_entries = max_entries
+        self.ttl         = ttl
+        self._vectors    = None            # (n, dim) matrix of unit vectors, least recently used first
+        self._entries    = []              # parallel list of (row id, question, answer, corpus version, time)
+        self._conn       = None
+        self._load()
+
+    def lookup(self, vector: list[float], version: Optional[int] = None) -> Optional[tuple[str, str]]:
+        """Return (cached_question, answer) for the closest match above threshold."""
+        self._expire(version)
+        if not self._entries:
+            return None
+        query = _unit(vector)
+        if query.shape[0] != self._vectors.shape[1]:
+            return None  # embedding model changed since the cache was written
+
+        scores = self._vectors @ query
+        best   = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        self._move_to_end(best)
+        row_id, question, answer, _, _ = self._entries[-1]
+        self._execute("UPDATE answers SET used = ? WHERE id = ?", (time.time(), row_id))
+        return question, answer
+
+    def insert(self, vector: list[float], question: str, answer: str, version: Optional[int] = None):
+        if not answer or not answer.strip():
+            return      # an empty (e.g. interrupted) answer is not worth serving again
+        row     = _unit(vector)[np.newaxis, :]
+        created = time.time()
+        cur     = self._execute(
+            "INSERT INTO answers (question, answer, version, created, used, vector) VALUES (?, ?, ?, ?, ?, ?)",
+            (question, answer, version, created, created, row.tobytes()),
+        )
+        entry = (cur.lastrowid if cur else None, question, answer, version, created)
+        if self._vectors is None or self._vectors.shape[1] != row.shape[1]:
+            self._delete(self._entries)    # written with another embedding model
+            self._vectors, self._entries = row, [entry]
+        else:
+            self._vectors = np.vstack([self._vectors, row])
+            self._entries.append(entry)
+
+        if len(self._entries) > self.max_entries:
+            overflow      = len(self._entries) - self.max_entries
+            self._delete(self._entries[:overflow])
+            self._vectors = self._vectors[overflow:]
+            self._entries = self._entries[overflow:]
+
+    def _expire(self, version: Optional[int]):
+        """Drop entries answered against another corpus version or older than ttl."""
+        cutoff = time.time() - self.ttl
+        keep   = [i for i, (_, _, _, v, t) in enumerate(self._entries) if v == version and t >= cutoff]
+        if len(keep) == len(self._entries):
+            return
+        kept = set(keep)
+        self._delete([entry for i, entry in enumerate(self._entries) if i not in kept])
+        self._vectors = self._vectors[keep] if keep else None
+        self._entries = [self._entries[i] for i in keep]
+
+    def _move_to_end(self, idx: int):
+        order         = [i for i in range(len(self._entries)) if i != idx] + [idx]
+        self._vectors = self._vectors[order]
+        self._entries = [self._entries[i] for i in order]
+
+    def _get_conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers (id INTEGER PRIMARY KEY, question TEXT NOT NULL,"
+                " answer TEXT NOT NULL, version INTEGER, created REAL NOT NULL, used REAL NOT NULL,"
+                " vector BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def _load(self):
+        try:
+            rows = self._get_conn().execute(
+                "SELECT id, question, answer, version, created, vector FROM answers ORDER BY used"
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Ask cache read failed: {e}")
+            return
+        if not rows:
+            return
+        # Keep the rows written with the current embedding size (the latest one)
+        vectors = [np.frombuffer(r[5], dtype=np.float32) for r in rows]
+        rows    = [(r, v) for r, v in zip(rows, vectors) if v.shape == vectors[-1].shape]
+        if rows:
+            self._vectors = np.vstack([v for _, v in rows])
+            self._entries = [r[:5] for r, _ in rows]
+
+    def _execute(self, sql: str, params: tuple):
+        try:
+            conn = self._get_conn()
+            cur  = conn.execute(sql, params)
+            conn.commit()
+            return cur
+        except sqlite3.Error as e:
+            print(f"Ask cache write failed: {e}")
+            return None
+
+    def _delete(self, entries: list):
+        try:
+            conn = self._get_conn()
+            conn.executemany("DELETE FROM answers WHERE id = ?", [(e[0],) for e in entries])
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Ask cache write failed: {e}")
+
+
+def _unit(vector) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    return v / (np.linalg.norm(v) or 1.0)
+
+
+# ── SHARED COMPONENTS ─────────────────────────────────────────────────────────
+# Built once per process: the embedding model load, DB connection, and the
+# Groq HTTP connection pool are reused across questions.
+
+@lru_cache(maxsize=1)
+def _get_store() -> VectorStore:
+    return VectorStore()
+
+
+@lru_cache(maxsize=1024)
+def _embed_cached(question: str) -> tuple:
+    """Repeated questions skip the embedding model entirely."""
+    return tuple(get_embedder().embed(question))
+
+
+@lru_cache(maxsize=1)
+def _get_cache() -> SemanticCache:
+    return SemanticCache()
+
+
+def ask_bidvault(question: str, cache: Optional[SemanticCache] = None):
     print(f"\n🤔 Question: {question}")
     
-    # 1. Initialize our local components
-    store = VectorStore()
-    embedder = Embedder()
+    # 1. Grab the shared local components
+    store = _get_store()
     
-    # 2. Get Search Results (Retrieval)
+    # 2. Check the semantic cache before doing any retrieval or LLM work
+    cache = cache or _get_cache()
+    query_vector = list(_embed_cached(question.strip()))
+    version = store.corpus_version()
+    cached = cache.lookup(query_vector, version)
+    if cached:
+        cached_question, answer = cached
+        print(f"⚡ Answer served from cache (matched: '{cached_question}')")
+        print("\n" + "="*50)
+        print("🤖 AI RESPONSE:")
+        print("="*50)
+        print(answer)
+        print("="*50 + "\n")
+        return answer
+
+    # 3. Get Search Results (Retrieval)
     print("⏳ Searching local knowledge base...")
-    query_vector = embedder.embed(question)
     results = store.search(query_vector, top_k=3)
     
     if not results:
         print("❌ No relevant information found in the local database.")
         return
 
-    # 3. Prepare Context for the LLM
+    # 4. Prepare Context for the LLM
     context_text = "\n\n".join([
         f"--- FROM DOCUMENT: {res.metadata.file_name} (Year: {res.metadata.year}) ---\n{res.text}"
         for res in results
@@ -40,43 +226,56 @@ def ask_bidvault(question: str):
     
     print(f"✅ Found {len(results)} relevant sections. Consulting Llama 3 on Groq...")
 
-    # 4. Prompt Engineering
-    system_prompt = (
-        "You are an expert legal and proposal assistant for a Kenyan firm. "
-        "Your task is to answer the user's question using ONLY the provided context snippets. "
-        "If the answer is not in the context, say you don't know based on the current data. "
-        "Always cite the document name and year in your answer. "
-        "Keep your tone professional and helpful."
-    )
-    
+    # 5. Prompt Engineering (static system prompt + per-question user prompt)
     user_prompt = f"CONTEXT:\n{context_text}\n\nUSER QUESTION: {question}"
 
-    # 5. Call Groq
+    # 6. Call Groq
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
         print("\n⚠️ ERROR: GROQ_API_KEY not found in .env file.")
         print("Please add: GROQ_API_KEY=your_key_here")
         return
 
-    client = Groq(api_key=api_key)
+    client = get_client(api_key)
     
     try:
-        chat_completion = client.chat.completions.create(
+        stream = client.chat.completions.create(
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT_ASK},
                 {"role": "user", "content": user_prompt},
             ],
             model="llama-3.3-70b-versatile", # Or your preferred Groq model
             temperature=0.2, # Lower temperature for factual accuracy
+            stream=True, # Print tokens as they arrive instead of waiting for the full answer
         )
-        
-        answer = chat_completion.choices[0].message.content
-        
+
         print("\n" + "="*50)
         print("🤖 AI RESPONSE:")
         print("="*50)
-        print(answer)
-        print("="*50 + "\n")
+
+        parts = []
+        usage = None
+        for chunk in stream:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    sys.stdout.write(delta)
+                    sys.stdout.flush()
+            # Groq reports usage on the final chunk under x_groq
+            x_groq = getattr(chunk, "x_groq", None)
+            usage  = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or usage
+
+        answer = "".join(parts)
+        print("\n" + "="*50 + "\n")
+
+        details       = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        if usage and usage.prompt_tokens:
+            print(f"💾 Prompt cache: {cached_tokens}/{usage.prompt_tokens} prompt tokens cached")
+
+        cache.insert(query_vector, question, answer, version)
+        return answer
         
     except Exception as e:
         print(f"\n❌ Error calling Groq: {e}")
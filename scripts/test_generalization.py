@@ -68,9 +68,9 @@ def test_generalization():
         
         # Verify with a quick search
         print("\n🔍 Verifying stored metadata via search...")
-        from bidvault.ingestion.embedder import Embedder
-        embedder = Embedder()
-        vs = VectorStore()
+        # Reuse the pipeline's embedder (model already loaded) and store connection
+        embedder = pipeline.embedder
+        vs = pipeline.vector_store
         
         # Search for something and check metadata
         query_embedding = embedder.embed("disclosure of data")
@@ -4,6 +4,7 @@ search_test.py
 Demonstrates how to differentiate documents and perform semantic search.
 """
 
+import asyncio
 import os
 import sys
 
@@ -13,25 +14,20 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from bidvault.ingestion.vector_store import VectorStore, SearchFilters
-from bidvault.ingestion.embedder import Embedder
 
 def run_search_demo():
     print("🔍 Semantic Search & Document Differentiation Demo\n")
     
     store = VectorStore()
-    embedder = Embedder()
     
     # 1. Ask a question related to the Data Protection Act we just ingested
     query = "What are the rights of a data subject?"
     print(f"Question: '{query}'")
     
-    # 2. Convert question to vector
-    print("⏳ Embedding query...")
-    query_vector = embedder.embed(query)
-    
-    # 3. Search high-similarity chunks
-    print("⏳ Searching database...")
-    results = store.search(query_vector, top_k=3)
+    # 2. Embed the question (through the shared, batched embedder) and
+    # 3. search high-similarity chunks
+    print("⏳ Embedding query and searching database...")
+    results = asyncio.run(store.search_text(query, top_k=3))
     
     if not results:
         print("❌ No results found. Did you run manual_test.py first?")
@@ -53,11 +49,11 @@ def run_search_demo():
     doc_id = results[0].metadata.document_id
     if doc_id:
         print(f"🎯 Filtering search to specifically target Document ID: {doc_id}")
-        filtered_results = store.search(
-            query_vector, 
+        filtered_results = asyncio.run(store.search_text(
+            query,
             filters=SearchFilters(document_id=doc_id),
             top_k=1
-        )
+        ))
         if filtered_results:
             print(f"✅ Re-verified chunk from: {filtered_results[0].metadata.file_name}")
 